@@ -0,0 +1,116 @@
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions, serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+EXPAND_RE = re.compile(r'\s*(\w+)\s*(?:\(([^()]*)\))?\s*(?:,|$)')
+
+
+def _split(value):
+    return {name for name in map(str.strip, value.split(',')) if name}
+
+
+def parse_sparse_fields(request, available):
+    """Возвращает множество запрошенных полей или None, если клиент
+    не ограничивал ответ параметрами `fields` и `omit`."""
+    fields = _split(request.query_params.get(FIELDS_PARAM, ''))
+    omit = _split(request.query_params.get(OMIT_PARAM, ''))
+    if not fields and not omit:
+        return None
+    unknown = (fields | omit) - set(available)
+    if unknown:
+        raise serializers.ValidationError(
+            {FIELDS_PARAM: f'Неизвестные поля: {", ".join(sorted(unknown))}'})
+    return (fields or set(available)) - omit
+
+
+def parse_expand(request, available):
+    """Разбирает `expand=reviews(limit=3,order=-score)` в словарь
+    `{'reviews': {'limit': '3', 'order': '-score'}}`."""
+    value = request.query_params.get(EXPAND_PARAM, '')
+    expand, position = {}, 0
+    while position < len(value):
+        match = EXPAND_RE.match(value, position)
+        if match is None or match.end() == position:
+            raise serializers.ValidationError(
+                {EXPAND_PARAM: 'Неверный формат параметра'})
+        position = match.end()
+        name, options = match.groups()
+        if name not in available:
+            raise serializers.ValidationError(
+                {EXPAND_PARAM: f'Неизвестное поле: {name}'})
+        expand[name] = {}
+        for option in filter(None, (options or '').split(',')):
+            key, sep, option_value = map(str.strip, option.partition('='))
+            if not sep or not key:
+                raise serializers.ValidationError(
+                    {EXPAND_PARAM: f'Неверный параметр: {option.strip()}'})
+            expand[name][key] = option_value
+    return expand
+
+
+class SparseFieldsSerializerMixin:
+    sparse_extra_fields = ()
+
+    def is_root(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None)
+
+    def get_read_request(self):
+        request = self.context.get('request')
+        if (request is not None and self.is_root()
+                and request.method in permissions.SAFE_METHODS):
+            return request
+        return None
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            request = self.get_read_request()
+            self._sparse_fields = None
+            if request is not None:
+                self._sparse_fields = parse_sparse_fields(
+                    request, [*super().get_fields(),
+                              *self.sparse_extra_fields])
+        return self._sparse_fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse_fields = self.get_sparse_fields()
+        if sparse_fields is None:
+            return fields
+        return {name: field for name, field in fields.items()
+                if name in sparse_fields}
+
+
+class SparseFieldsViewMixin:
+    """Сужает SQL под поля, оставленные сериализатором: загружает только
+    их колонки и связанные объекты, остальные select_related и
+    prefetch_related сбрасываются."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        if serializer.get_sparse_fields() is None:
+            return queryset
+        opts = queryset.model._meta
+        columns, related, many = [opts.pk.name], [], []
+        for field in serializer.fields.values():
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                continue
+            if model_field.many_to_many:
+                many.append(model_field.name)
+                continue
+            columns.append(model_field.name)
+            if model_field.is_relation:
+                related.append(model_field.name)
+        queryset = queryset.select_related(None).prefetch_related(
+            None).prefetch_related(*many).only(*columns)
+        # select_related() без аргументов подтянул бы все внешние ключи.
+        return queryset.select_related(*related) if related else queryset
@@ -0,0 +1,41 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.settings import api_settings
+
+MAX_PAGE_SIZE = 100
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    cursor_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (getattr(view, 'cursor_ordering', None)
+                and KeysetPagination.cursor_query_param
+                in request.query_params):
+            # Курсор строится по cursor_ordering, поэтому другой порядок
+            # (в том числе по релевантности поиска) с ним несовместим.
+            if {api_settings.ORDERING_PARAM,
+                    api_settings.SEARCH_PARAM} & set(request.query_params):
+                raise ValidationError({
+                    KeysetPagination.cursor_query_param: (
+                        'Параметры ordering и search не поддерживаются '
+                        'вместе с cursor')})
+            self.cursor_pagination = KeysetPagination()
+            return self.cursor_pagination.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
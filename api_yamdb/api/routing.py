@@ -0,0 +1,118 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import permissions
+
+STICKY_COOKIE = 'yamdb_primary_until'
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+@contextmanager
+def replica_routing(use_replica):
+    """Разрешает чтение с реплик до первой записи в этом контексте."""
+    state = {'use_replica': use_replica, 'wrote': False}
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Чтения безопасных запросов идут на случайную реплику из
+    DATABASE_REPLICAS, записи и всё остальное — на основную базу."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (state is None or not state['use_replica'] or state['wrote']
+                or not settings.DATABASE_REPLICAS):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными основной базы.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплик для GET/HEAD/OPTIONS. После записи
+    клиент получает cookie и ещё REPLICA_STICKY_SECONDS читает
+    с основной базы, чтобы сразу видеть свои изменения."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_sticky(self, request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def use_replica(self, request):
+        return (request.method in permissions.SAFE_METHODS
+                and not self.is_sticky(request))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_routing(self.use_replica(request)) as state:
+            response = self.get_response(request)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        # Асинхронный ORM выполняет запросы в потоках с копией контекста,
+        # поэтому отметка о записи попадает в тот же state.
+        with replica_routing(self.use_replica(request)) as state:
+            response = await self.get_response(request)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        if state['wrote']:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class AsyncReadsMiddleware:
+    """Под ASGI подключает ASYNC_ROOT_URLCONF с асинхронными
+    представлениями чтения. Под WSGI маршруты не меняются: там
+    асинхронное представление только заняло бы поток своим циклом
+    событий."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if not iscoroutinefunction(self):
+            return self.get_response(request)
+        if settings.ASYNC_ROOT_URLCONF:
+            request.urlconf = settings.ASYNC_ROOT_URLCONF
+        return self.get_response(request)
@@ -6,6 +6,7 @@ from django.conf import settings
 
 from rest_framework import serializers
 
+from .fieldsets import SparseFieldsSerializerMixin
 from .models import User
 
 RESERVED_USERNAMES = ['me']
@@ -13,7 +14,8 @@ MAX_USERNAME_LENGTH = 150
 MAX_EMAIL_LENGTH = 254
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
 
     class Meta:
         model = User
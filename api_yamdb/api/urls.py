@@ -15,6 +15,9 @@ from reviews.views import (
     TitleViewSet,
     ReviewViewSet,
     CommentViewSet,
+    ReviewSearchView,
+    CommentSearchView,
+    ExportView,
 )
 
 router_v1 = routers.DefaultRouter()
@@ -34,6 +37,11 @@ reviews_router_v1 = nested_routers.NestedDefaultRouter(titles_router_v1,
 reviews_router_v1.register(r'comments', CommentViewSet, basename='comments')
 
 urlpatterns = [
+    path('v1/reviews/search/', ReviewSearchView.as_view(),
+         name='reviews-search'),
+    path('v1/comments/search/', CommentSearchView.as_view(),
+         name='comments-search'),
+    path('v1/export/<str:resource>/', ExportView.as_view(), name='export'),
     path('v1/', include(router_v1.urls)),
     path('v1/', include(titles_router_v1.urls)),
     path('v1/', include(reviews_router_v1.urls)),
@@ -11,6 +11,7 @@ from .serializers import (
     UserSerializer,
     SigninSerializer,
 )
+from .fieldsets import SparseFieldsViewMixin
 from .models import User
 from .permissions import IsAdminRole
 
@@ -59,7 +60,7 @@ class SigninView(APIView):
         })
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdminRole]
@@ -68,6 +69,7 @@ class UserViewSet(viewsets.ModelViewSet):
     filterset_fields = ['username', 'email', 'role']
     search_fields = ['username', 'email', 'role']
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cursor_ordering = ['id']
 
     @action(detail=False,
             methods=['get', 'patch'],
@@ -0,0 +1,27 @@
+"""Маршруты для запросов через ASGI: асинхронные представления чтения
+поверх обычных маршрутов из ROOT_URLCONF."""
+from django.conf import settings
+from django.urls import include, path
+
+from reviews.async_views import (
+    CategoryAsyncView,
+    CommentAsyncView,
+    GenreAsyncView,
+    ReviewAsyncView,
+    TitleAsyncView,
+)
+
+REVIEWS = 'api/v1/titles/<int:title_id>/reviews/'
+COMMENTS = f'{REVIEWS}<int:review_id>/comments/'
+
+urlpatterns = [
+    path('api/v1/categories/', CategoryAsyncView.as_view()),
+    path('api/v1/genres/', GenreAsyncView.as_view()),
+    path('api/v1/titles/', TitleAsyncView.as_view()),
+    path('api/v1/titles/<int:id>/', TitleAsyncView.as_view(detail=True)),
+    path(REVIEWS, ReviewAsyncView.as_view()),
+    path(f'{REVIEWS}<int:id>/', ReviewAsyncView.as_view(detail=True)),
+    path(COMMENTS, CommentAsyncView.as_view()),
+    path(f'{COMMENTS}<int:id>/', CommentAsyncView.as_view(detail=True)),
+    path('', include(settings.ROOT_URLCONF)),
+]
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from datetime import timedelta
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.routing.ReplicaRoutingMiddleware',
+    'api.routing.AsyncReadsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -40,6 +43,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Under ASGI, plain GET lists and objects are served by async views.
+# None keeps the sync DRF views only.
+ASYNC_ROOT_URLCONF = 'api_yamdb.async_urls'
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
@@ -68,6 +75,71 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile: YAMDB_SQLITE_PROFILE=production
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_LOCK_RETRIES = 3
+
+SQLITE_LOCK_RETRY_DELAY = 0.05
+
+SQLITE_PRODUCTION_PROFILE = {
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'init_command': ';'.join(
+            f'PRAGMA {name}={value}'
+            for name, value in SQLITE_PRODUCTION_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': SQLITE_PRODUCTION_PRAGMAS['busy_timeout'] / 1000,
+    },
+}
+
+if os.environ.get('YAMDB_SQLITE_PROFILE') == 'production':
+    DATABASES['default'].update(SQLITE_PRODUCTION_PROFILE)
+
+# Read replicas: aliases from DATABASES for reads of GET requests.
+# YAMDB_SQLITE_REPLICAS adds comma-separated SQLite copies of the primary.
+
+DATABASE_ROUTERS = ['api.routing.PrimaryReplicaRouter']
+
+DATABASE_REPLICAS = []
+
+REPLICA_STICKY_SECONDS = 10
+
+for number, path in enumerate(
+        filter(None, os.environ.get('YAMDB_SQLITE_REPLICAS', '').split(',')),
+        1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+TITLE_CACHE_ALIAS = 'default'
+
+TITLE_CACHE_TIMEOUT = 60 * 60
+
+SLUG_CACHE_TIMEOUT = 5
+
+TITLE_RANK_MIN_REVIEWS = 10
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -127,7 +199,7 @@ REST_FRAMEWORK = {
         'anon': '1000/day',
     },
     'DEFAULT_PAGINATION_CLASS':
-    'rest_framework.pagination.PageNumberPagination',
+    'api.pagination.PageNumberOrCursorPagination',
     'PAGE_SIZE':
     5,
     'DEFAULT_FILTER_BACKENDS':
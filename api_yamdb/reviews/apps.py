@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def install_title_search_index(sender, using, plan=None, **kwargs):
+    # Откат миграций сам удаляет индексы, восстанавливать их нельзя.
+    if any(backwards for _, backwards in plan or ()):
+        return
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(install_title_search_index, sender=self)
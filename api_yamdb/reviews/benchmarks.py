@@ -0,0 +1,370 @@
+import asyncio
+import datetime
+import itertools
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    connection,
+    connections,
+    transaction,
+)
+from django.utils import timezone
+
+from .cache import SLUG_CACHES
+from .models import Category, Comment, Genre, Review, Title, TitleStats, User
+from .utils import retry_on_locked
+
+LOOKUP_INDEXES = (
+    'review_title_date_idx',
+    'comment_review_date_idx',
+    'user_email_idx',
+)
+SEED_BATCH_SIZE = 1000
+
+
+def hot_queries():
+    review = Review.objects.order_by('-pk').first()
+    user = User.objects.order_by('-pk').first()
+    title_id = review.title_id if review else 0
+    return {
+        'отзывы произведения по дате': Review.objects.filter(
+            title_id=title_id).order_by('-pub_date', '-id')[:10],
+        'комментарии отзыва по дате': Comment.objects.filter(
+            review_id=review.pk if review else 0,
+        ).order_by('-pub_date', '-id')[:10],
+        'повторный отзыв автора': Review.objects.filter(
+            author_id=review.author_id if review else 0,
+            title_id=title_id).values('pk')[:1],
+        'пользователь по почте': User.objects.filter(
+            email=user.email if user else '').values('pk')[:1],
+        'произведения по году': Title.objects.filter(
+            year=2000).order_by('id')[:10],
+        'произведения по названию': Title.objects.filter(
+            name__startswith='Произведение 1').order_by('name', 'id')[:10],
+    }
+
+
+def seed(titles, reviews_per_title=10):
+    """Одно популярное произведение собирает отзывы всех пользователей,
+    а его последний отзыв — по комментарию от каждого из них."""
+    now = timezone.now()
+    category = Category.objects.create(name='Тест', slug='benchmark')
+    genre = Genre.objects.create(name='Тест', slug='benchmark')
+    User.objects.bulk_create(
+        (User(username=f'benchmark{number}',
+              email=f'benchmark{number}@yamdb.fake')
+         for number in range(titles)), batch_size=SEED_BATCH_SIZE)
+    user_ids = list(User.objects.filter(
+        username__startswith='benchmark').values_list('pk', flat=True))
+    Title.objects.bulk_create(
+        (Title(name=f'Произведение {number}', year=1900 + number % 125,
+               category=category) for number in range(titles + 1)),
+        batch_size=SEED_BATCH_SIZE)
+    title_ids = list(Title.objects.filter(
+        category=category).order_by('pk').values_list('pk', flat=True))
+    Title.genre.through.objects.bulk_create(
+        (Title.genre.through(title_id=title_id, genre_id=genre.pk)
+         for title_id in title_ids), batch_size=SEED_BATCH_SIZE)
+    authors = [
+        (title_id, user_ids[(number + shift) % titles])
+        for number, title_id in enumerate(title_ids[:-1])
+        for shift in range(min(reviews_per_title, titles))
+    ] + [(title_ids[-1], user_id) for user_id in user_ids]
+    Review.objects.bulk_create(
+        (Review(title_id=title_id, author_id=author_id, score=5,
+                text='Отзыв',
+                pub_date=now - datetime.timedelta(minutes=number % 1000))
+         for number, (title_id, author_id) in enumerate(authors)),
+        batch_size=SEED_BATCH_SIZE)
+    review_ids = Review.objects.filter(
+        title_id__in=title_ids).order_by('pk').values_list('pk', flat=True)
+    Comment.objects.bulk_create(
+        (Comment(review_id=review_id, author_id=user_ids[0],
+                 text='Комментарий', pub_date=now)
+         for review_id in review_ids.iterator()), batch_size=SEED_BATCH_SIZE)
+    popular_review_id = review_ids.last()
+    Comment.objects.bulk_create(
+        (Comment(review_id=popular_review_id, author_id=user_id,
+                 text='Комментарий',
+                 pub_date=now - datetime.timedelta(minutes=number))
+         for number, user_id in enumerate(user_ids)),
+        batch_size=SEED_BATCH_SIZE)
+
+
+def explain(queryset, label):
+    # Метка делает текст запроса уникальным: иначе sqlite3 возьмёт из кэша
+    # план, подготовленный до удаления индексов.
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql} -- {label}', params)
+        return '\n'.join(' '.join(map(str, row)) for row in cursor)
+
+
+def measure(queries, repeat, label):
+    results = {}
+    for name, queryset in queries.items():
+        plan = explain(queryset, label)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        results[name] = (plan, elapsed)
+    return results
+
+
+def drop_lookup_indexes():
+    with connection.cursor() as cursor:
+        for name in LOOKUP_INDEXES:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+
+
+def explain_lookups(titles=0, repeat=20):
+    """Сравнивает планы горячих запросов с индексами и без них.
+
+    Тестовые данные и удаление индексов выполняются в одной транзакции,
+    которая затем откатывается, поэтому база остаётся без изменений.
+    """
+    with transaction.atomic():
+        if titles:
+            seed(titles)
+        queries = hot_queries()
+        after = measure(queries, repeat, 'after')
+        drop_lookup_indexes()
+        before = measure(queries, repeat, 'before')
+        transaction.set_rollback(True)
+    return {name: (before[name], after[name]) for name in queries}
+
+
+SQLITE_PROFILES = ('default', 'production')
+# Настройки Django по умолчанию, которые меняет профиль production.
+SQLITE_DEFAULT_PROFILE = {
+    'CONN_MAX_AGE': 0,
+    'CONN_HEALTH_CHECKS': False,
+    'OPTIONS': {},
+}
+LOAD_TITLES = 100
+LOAD_AUTHORS = 1000
+
+
+def get_profile_settings(profile, path):
+    settings_dict = {**connections[DEFAULT_DB_ALIAS].settings_dict,
+                     **SQLITE_DEFAULT_PROFILE, 'NAME': path}
+    if profile == 'production':
+        settings_dict.update(settings.SQLITE_PRODUCTION_PROFILE)
+    return settings_dict
+
+
+@contextmanager
+def use_database(settings_dict):
+    """Подменяет соединение default в текущем потоке, чтобы код
+    приложения с его сигналами работал с временной базой."""
+    previous = connections[DEFAULT_DB_ALIAS]
+    wrapper = previous.__class__(settings_dict, DEFAULT_DB_ALIAS)
+    connections[DEFAULT_DB_ALIAS] = wrapper
+    try:
+        yield wrapper
+    finally:
+        wrapper.close()
+        connections[DEFAULT_DB_ALIAS] = previous
+
+
+def create_load_database(path):
+    """Создаёт схему миграциями и заполняет её произведениями
+    и авторами. Возвращает id произведений и авторов."""
+    with use_database(get_profile_settings('default', path)):
+        call_command('migrate', verbosity=0, interactive=False)
+        titles = Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(LOAD_TITLES))
+        TitleStats.objects.bulk_create(
+            TitleStats(title=title) for title in titles)
+        User.objects.bulk_create(
+            (User(username=f'load{number}', email=f'load{number}@yamdb.fake')
+             for number in range(LOAD_AUTHORS)), batch_size=SEED_BATCH_SIZE)
+        authors = list(User.objects.filter(
+            username__startswith='load').values_list('pk', flat=True))
+    # Миграции и запись шли мимо основной базы: сбрасываем кэши id.
+    ContentType.objects.clear_cache()
+    for cache in SLUG_CACHES.values():
+        cache.invalidate()
+    return [title.pk for title in titles], authors
+
+
+def read_reviews(number, title_ids, author_ids):
+    list(Review.objects.filter(
+        title_id=title_ids[number % len(title_ids)],
+    ).select_related('author').order_by('-pub_date', '-id')[:10])
+
+
+def write_review(number, title_ids, author_ids):
+    # Тот же путь, что у POST отзыва: вставка и сигналы с пересчётом
+    # рейтинга, сводки и места произведения в одной транзакции.
+    retry_on_locked(
+        Review.objects.create,
+        title_id=title_ids[number % len(title_ids)],
+        author_id=author_ids[number // len(title_ids) % len(author_ids)],
+        score=7, text='Отзыв ' * 20, pub_date=timezone.now())
+
+
+def run_load_worker(settings_dict, operation, numbers, ids, deadline,
+                    results):
+    done = locked = 0
+    with use_database(settings_dict) as wrapper:
+        while time.perf_counter() < deadline:
+            try:
+                operation(next(numbers), *ids)
+                done += 1
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                locked += 1
+            finally:
+                # Как по окончании запроса: без CONN_MAX_AGE соединение
+                # закрывается, в профиле production остаётся открытым.
+                wrapper.close_if_unusable_or_obsolete()
+    results.append((operation, done, locked))
+
+
+def sqlite_load(profile, seconds=2.0, readers=4, writers=2):
+    """Нагружает временную копию схемы чтением ленты отзывов и записью
+    отзывов через ORM, как это делает API.
+
+    Соединения строятся из DATABASES['default']: профиль default — с
+    настройками Django по умолчанию, production — с
+    SQLITE_PRODUCTION_PROFILE (прагмы, BEGIN IMMEDIATE, timeout
+    и постоянные соединения). Записи повторяются через retry_on_locked.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'load.sqlite3')
+        ids = create_load_database(path)
+        settings_dict = get_profile_settings(profile, path)
+        reads, writes = itertools.count(), itertools.count()
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=run_load_worker, args=(
+                settings_dict, operation, numbers, ids, deadline, results))
+            for operation, numbers, count in ((read_reviews, reads, readers),
+                                              (write_review, writes, writers))
+            for _ in range(count)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    return {
+        'reads_per_second': sum(
+            done for operation, done, _ in results
+            if operation is read_reviews) / elapsed,
+        'writes_per_second': sum(
+            done for operation, done, _ in results
+            if operation is write_review) / elapsed,
+        'locked': sum(locked for _, _, locked in results),
+    }
+
+
+HANDLER_MODES = ('sync', 'async')
+
+
+def wsgi_request(handler, path, client_delay):
+    path, _, query = path.partition('?')
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path,
+               'QUERY_STRING': query}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = handler(environ, lambda status, headers, exc_info=None:
+                   statuses.append(status))
+    try:
+        b''.join(body)
+        # Медленный клиент: поток WSGI занят, пока ответ не передан.
+        time.sleep(client_delay)
+    finally:
+        body.close()
+    return statuses[0].startswith('200')
+
+
+async def asgi_request(application, path, client_delay):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    received = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        if received.is_set():
+            # Клиент не отключается: ждём, пока сервер не отменит ожидание.
+            await asyncio.Future()
+        received.set()
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif not message.get('more_body'):
+            await asyncio.sleep(client_delay)
+
+    await application(scope, receive, send)
+    return statuses[0] == 200
+
+
+async def run_async_clients(path, clients, requests, client_delay):
+    application = ASGIHandler()
+    semaphore = asyncio.Semaphore(clients)
+
+    async def run_client():
+        async with semaphore:
+            return await asgi_request(application, path, client_delay)
+
+    return await asyncio.gather(*(run_client() for _ in range(requests)))
+
+
+def concurrency_load(path, mode, clients=100, requests=400, threads=4,
+                     client_delay=0.1):
+    """Отправляет requests GET-запросов к path от clients одновременных
+    клиентов, каждый из которых читает ответ client_delay секунд.
+
+    Оба режима — один рабочий процесс. В режиме sync его WSGI-обработчик
+    держит threads потоков, как gunicorn с gthread, и каждый медленный
+    клиент занимает поток. В режиме async всех клиентов обслуживает
+    один цикл событий ASGI с асинхронными представлениями чтения.
+    """
+    started = time.perf_counter()
+    if mode == 'sync':
+        handler = WSGIHandler()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(
+                lambda _: wsgi_request(handler, path, client_delay),
+                range(requests)))
+    else:
+        results = asyncio.run(
+            run_async_clients(path, clients, requests, client_delay))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_second': len(results) / elapsed,
+        'errors': results.count(False),
+    }
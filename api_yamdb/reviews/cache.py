@@ -0,0 +1,145 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+from .models import CATEGORIES, GENRES, Category, CollectionVersion, Genre
+
+HITS_KEY = 'title-card:hits'
+MISSES_KEY = 'title-card:misses'
+
+
+class TitleCardCache:
+
+    @property
+    def cache(self):
+        return caches[settings.TITLE_CACHE_ALIAS]
+
+    @property
+    def timeout(self):
+        return settings.TITLE_CACHE_TIMEOUT
+
+    def get_key(self, title):
+        return f'title-card:{title.pk}:{title.version}'
+
+    def get_cards(self, titles, render):
+        keys = [self.get_key(title) for title in titles]
+        cards = self.cache.get_many(keys)
+        missing = [
+            title for title, key in zip(titles, keys) if key not in cards
+        ]
+        if missing:
+            prefetch_related_objects(missing, 'genre')
+            fresh = {self.get_key(title): render(title) for title in missing}
+            self.cache.set_many(fresh, self.timeout)
+            cards.update(fresh)
+        self.count(HITS_KEY, len(titles) - len(missing))
+        self.count(MISSES_KEY, len(missing))
+        return [cards[key] for key in keys]
+
+    def count(self, key, value):
+        if not value:
+            return
+        try:
+            self.cache.incr(key, value)
+        except ValueError:
+            self.cache.add(key, 0, None)
+            self.cache.incr(key, value)
+
+    def get_stats(self):
+        counters = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits = counters.get(HITS_KEY, 0)
+        misses = counters.get(MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else None,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+title_cards = TitleCardCache()
+
+
+class SlugCache:
+
+    def __init__(self, model, collection_name):
+        self.model = model
+        self.collection_name = collection_name
+        self.ids = None
+        self.misses = set()
+        self.version = None
+        self.checked = 0.0
+
+    @property
+    def timeout(self):
+        return settings.SLUG_CACHE_TIMEOUT
+
+    def get_ids(self):
+        if (self.ids is not None
+                and time.monotonic() - self.checked < self.timeout):
+            return self.ids
+        version = CollectionVersion.objects.filter(
+            name=self.collection_name,
+        ).values_list('version', flat=True).first()
+        if self.ids is None or version != self.version:
+            self.ids = dict(self.model.objects.values_list('slug', 'pk'))
+            self.misses = set()
+            self.version = version
+        self.checked = time.monotonic()
+        return self.ids
+
+    def resolve(self, slugs):
+        ids = self.get_ids()
+        if not self.misses.isdisjoint(slugs):
+            # Перед запомненным промахом сверяем версию: слаг мог
+            # появиться в другом процессе.
+            self.checked = 0.0
+            ids = self.get_ids()
+        missing = {slug for slug in slugs if slug not in ids} - self.misses
+        if missing:
+            # Неизвестные слаги проверяем одним запросом и запоминаем
+            # промахи до смены версии коллекции.
+            ids.update(self.model.objects.filter(
+                slug__in=missing).values_list('slug', 'pk'))
+            self.misses.update(missing - ids.keys())
+        return {slug: ids[slug] for slug in slugs if slug in ids}
+
+    def get(self, slug):
+        return self.resolve([slug]).get(slug)
+
+    def resolve_for_write(self, slugs):
+        """Как resolve, но для записи: найденные id сверяются с БД и
+        блокируются до конца транзакции. Запись удалённой в другом
+        процессе строки иначе упадёт на внешнем ключе при фиксации."""
+        ids = self.resolve(slugs)
+        found = self.lock(ids.values())
+        if len(found) != len(set(ids.values())):
+            self.invalidate()
+            ids = self.resolve(slugs)
+            found = self.lock(ids.values())
+        return {slug: pk for slug, pk in ids.items() if pk in found}
+
+    def get_for_write(self, slug):
+        return self.resolve_for_write([slug]).get(slug)
+
+    def lock(self, pks):
+        with transaction.atomic():
+            return set(self.model.objects.select_for_update().filter(
+                pk__in=pks).values_list('pk', flat=True))
+
+    def invalidate(self):
+        self.ids = None
+
+
+category_id_cache = SlugCache(Category, CATEGORIES)
+genre_id_cache = SlugCache(Genre, GENRES)
+SLUG_CACHES = {
+    CATEGORIES: category_id_cache,
+    GENRES: genre_id_cache,
+}
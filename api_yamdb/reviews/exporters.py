@@ -0,0 +1,177 @@
+import csv
+import datetime
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Review, Title, Tombstone, User
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+class ExportResource:
+    model = None
+    columns = {}
+    since_field = None
+
+    @property
+    def fields(self):
+        return tuple(self.columns)
+
+    def get_queryset(self):
+        return self.model.objects.values_list(*self.columns.values())
+
+    def get_row(self, values):
+        return dict(zip(self.columns, values))
+
+    def rows(self, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+        queryset = self.get_queryset().order_by('pk')
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.since_field}__gte': since})
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield self.get_row(obj)
+
+
+class TitleExport(ExportResource):
+    model = Title
+    fields = ('id', 'name', 'year', 'description', 'category', 'genre',
+              'rating', 'review_count', 'modified')
+    since_field = 'modified'
+
+    def get_queryset(self):
+        return Title.objects.select_related('category').prefetch_related(
+            'genre')
+
+    def get_row(self, title):
+        return {
+            'id': title.id,
+            'name': title.name,
+            'year': title.year,
+            'description': title.description,
+            'category': title.category and title.category.slug,
+            'genre': [genre.slug for genre in title.genre.all()],
+            'rating': title.rating,
+            'review_count': title.review_count,
+            'modified': title.modified,
+        }
+
+
+class ReviewExport(ExportResource):
+    model = Review
+    columns = {
+        'id': 'id',
+        'title': 'title_id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+        'modified': 'modified',
+    }
+    since_field = 'modified'
+
+
+class CommentExport(ExportResource):
+    model = Comment
+    columns = {
+        'id': 'id',
+        'title': 'review__title_id',
+        'review': 'review_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'modified': 'modified',
+    }
+    since_field = 'modified'
+
+
+class UserExport(ExportResource):
+    model = User
+    columns = {field: field for field in (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+        'date_joined', 'modified')}
+    since_field = 'modified'
+
+
+class DeletionExport(ExportResource):
+    """Удалённые произведения, отзывы, комментарии и пользователи:
+    остальные выгрузки с `since` отдают только живые записи."""
+    model = Tombstone
+    columns = {
+        'resource': 'resource',
+        'id': 'object_id',
+        'deleted': 'deleted',
+    }
+    since_field = 'deleted'
+
+
+EXPORTS = {
+    'titles': TitleExport(),
+    'reviews': ReviewExport(),
+    'comments': CommentExport(),
+    'users': UserExport(),
+    'deletions': DeletionExport(),
+}
+
+
+def parse_since(value):
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError('Неверный формат даты')
+        since = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _chunks(lines, size):
+    while chunk := ''.join(islice(lines, size)):
+        yield chunk
+
+
+def stream_ndjson(resource, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    lines = (json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder)
+             + '\n' for row in rows)
+    return _chunks(lines, chunk_size)
+
+
+def stream_csv(resource, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    header = writer.writerow(resource.fields)
+    lines = (writer.writerow([_csv_value(row[field])
+                              for field in resource.fields])
+             for row in rows)
+    yield header
+    yield from _chunks(lines, chunk_size)
+
+
+STREAMS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+}
+
+
+def export(name, export_format='ndjson', since=None,
+           chunk_size=EXPORT_CHUNK_SIZE):
+    resource = EXPORTS[name]
+    return STREAMS[export_format](
+        resource, resource.rows(since, chunk_size), chunk_size)
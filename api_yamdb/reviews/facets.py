@@ -0,0 +1,93 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from .filters import TitleFilter
+from .models import CATALOGUE, Category, Genre, Title
+from .utils import get_collection_version
+
+FACETS_PARAM = 'facets'
+LIST_FILTERS = ('category', 'genre')
+
+
+def parse_facets(request):
+    names = TitleFilter.split(request.query_params.get(FACETS_PARAM, ''))
+    unknown = set(names) - set(TITLE_FACETS)
+    if unknown:
+        raise serializers.ValidationError({
+            FACETS_PARAM: f'Неизвестные фасеты: {", ".join(sorted(unknown))}'})
+    return names
+
+
+def get_filter_key(request):
+    """Параметры фильтрации в каноническом виде: порядок параметров
+    и слагов в списках не влияет на ключ кэша."""
+    key = []
+    for name in sorted({*TitleFilter.base_filters,
+                        api_settings.SEARCH_PARAM}):
+        value = request.query_params.get(name, '').strip()
+        if name in LIST_FILTERS:
+            value = ','.join(sorted(TitleFilter.split(value)))
+        if value:
+            key.append((name, value))
+    return tuple(key)
+
+
+def count_slugs(model, field, links, filtered):
+    # Без фильтров счётчики уже лежат в строках категорий и жанров.
+    if not filtered:
+        rows = model.objects.filter(title_count__gt=0).values_list(
+            'slug', 'name', 'title_count').order_by('-title_count', 'slug')
+    else:
+        rows = links.values_list(f'{field}__slug', f'{field}__name').annotate(
+            count=Count('pk')).order_by('-count', f'{field}__slug')
+    return [{'slug': slug, 'name': name, 'count': count}
+            for slug, name, count in rows]
+
+
+def count_genres(queryset, filtered):
+    return count_slugs(Genre, 'genre', Title.genre.through.objects.filter(
+        title_id__in=queryset.values('pk')), filtered)
+
+
+def count_categories(queryset, filtered):
+    return count_slugs(Category, 'category', Title.objects.filter(
+        pk__in=queryset.values('pk'), category__isnull=False), filtered)
+
+
+def count_years(queryset, filtered):
+    if filtered:
+        queryset = Title.objects.filter(pk__in=queryset.values('pk'))
+    return list(queryset.order_by().values('year').annotate(
+        count=Count('pk')).order_by('-year'))
+
+
+TITLE_FACETS = {
+    'genre': count_genres,
+    'category': count_categories,
+    'year': count_years,
+}
+
+
+def get_title_facets(request, names, get_queryset):
+    """Считает фасеты для текущего набора фильтров группирующими
+    запросами. Результат кэшируется по ключу фильтров и версии
+    каталога: её меняют правки произведений, жанров и категорий,
+    но не пересчёт рейтингов."""
+    filter_key = get_filter_key(request)
+    stamp = get_collection_version(CATALOGUE)
+    digest = hashlib.md5(repr((filter_key, names)).encode(),
+                         usedforsecurity=False).hexdigest()
+    cache_key = f'title-facets:{stamp.version if stamp else 0}:{digest}'
+    cache = caches[settings.TITLE_CACHE_ALIAS]
+    facets = cache.get(cache_key)
+    if facets is None:
+        queryset = get_queryset().order_by()
+        facets = {name: TITLE_FACETS[name](queryset, bool(filter_key))
+                  for name in names}
+        cache.set(cache_key, facets, settings.TITLE_CACHE_TIMEOUT)
+    return facets
@@ -1,13 +1,85 @@
 import django_filters
+from django.db.models import Exists, F, OuterRef
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .cache import category_id_cache, genre_id_cache
 from .models import Title
 
 
 class TitleFilter(django_filters.FilterSet):
-    category = django_filters.CharFilter(field_name='category__slug',
-                                         lookup_expr='exact')
-    genre = django_filters.CharFilter(field_name='genre__slug',
-                                      lookup_expr='exact')
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=[('any', 'any'), ('all', 'all')], method='filter_nothing')
+    year_min = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='gte')
+    year_max = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='lte')
 
     class Meta:
         model = Title
         fields = ['category', 'genre', 'name', 'year']
+
+    @staticmethod
+    def split(value):
+        return list(dict.fromkeys(
+            slug for slug in map(str.strip, value.split(',')) if slug))
+
+    def filter_nothing(self, queryset, name, value):
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        category_ids = category_id_cache.resolve(self.split(value))
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids.values())
+
+    def filter_genre(self, queryset, name, value):
+        # Связи проверяются подзапросами EXISTS по индексу
+        # (title_id, genre_id): JOIN не размножает строки произведений.
+        slugs = self.split(value)
+        genre_ids = genre_id_cache.resolve(slugs)
+        match_all = self.form.cleaned_data.get('genre_match') == 'all'
+        if not genre_ids or match_all and len(genre_ids) < len(slugs):
+            return queryset.none()
+        links = Title.genre.through.objects.filter(title_id=OuterRef('pk'))
+        if not match_all:
+            return queryset.filter(
+                Exists(links.filter(genre_id__in=genre_ids.values())))
+        return queryset.filter(*(
+            Exists(links.filter(genre_id=genre_id))
+            for genre_id in genre_ids.values()))
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    # Произведения без отзывов считаются наименее оцененными, а равные
+    # значения упорядочиваются по id, чтобы страницы были стабильными.
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        order_by = [self.get_order_expression(field) for field in ordering]
+        if not {'id', '-id'} & set(ordering):
+            order_by.append('id')
+        return queryset.order_by(*order_by)
+
+    def get_order_expression(self, field):
+        if field == '-rating':
+            return F('rating').desc(nulls_last=True)
+        if field == 'rating':
+            return F('rating').asc(nulls_first=True)
+        return field
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return view.search_index.search(queryset, query)
+        return view.search_index.ranked_search(queryset, query)
@@ -0,0 +1,306 @@
+import csv
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .models import (
+    CATALOGUE,
+    CATEGORIES,
+    GENRES,
+    TITLES,
+    Category,
+    Comment,
+    Genre,
+    ImportCheckpoint,
+    Review,
+    Title,
+    User,
+)
+from .parsers import get_row_key, parse_block, read_blocks, read_header
+from .search import drop_search_index, rebuild_search_index
+from .utils import (
+    bump_collection_versions,
+    rebuild_title_ranks,
+    rebuild_title_stats,
+    recalculate_title_ratings,
+    recount_category_titles,
+    recount_genre_titles,
+)
+
+# Сколько пропущенных строк каждой таблицы перечисляется поимённо.
+SKIPPED_ROWS_REPORTED = 100
+RELAXED_PRAGMAS = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',
+}
+
+
+class ImportFailed(Exception):
+    pass
+
+
+class IdMap:
+
+    def __init__(self, ids=()):
+        self.ids = set(ids)
+        self.aliases = {}
+
+    def resolve(self, key):
+        if key is None:
+            return None
+        if key in self.aliases:
+            return self.aliases[key]
+        return key if key in self.ids else None
+
+
+class CsvTable:
+
+    def __init__(self, name, model, unique_fields=('id', ),
+                 update_fields=(), foreign_keys=None, optional_keys=(),
+                 mapped=True, defaults=None):
+        self.name = name
+        self.filename = f'{name}.csv'
+        self.model = model
+        self.unique_fields = unique_fields
+        self.update_fields = update_fields
+        self.foreign_keys = foreign_keys or {}
+        self.optional_keys = optional_keys
+        self.mapped = mapped
+        self.defaults = defaults or {}
+
+    def get_id_map(self, path):
+        if 'id' in self.unique_fields or not path.exists():
+            return IdMap(self.model.objects.values_list('pk', flat=True))
+        id_map = IdMap()
+        natural_key, = self.unique_fields
+        pks = dict(self.model.objects.values_list(natural_key, 'pk'))
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            for key, row in enumerate(csv.DictReader(file), start=1):
+                id_map.aliases[key] = pks.get(row[natural_key])
+        return id_map
+
+    def build(self, values, ids):
+        for field, parent in self.foreign_keys.items():
+            pk = ids[parent].resolve(values[field])
+            if pk is None and field not in self.optional_keys:
+                raise ValueError(
+                    f'{field}={values[field]} нет в {parent}.csv')
+            values[field] = pk
+        return self.model(**values, **self.defaults)
+
+    def bulk_create(self, objects, upsert=False):
+        if not upsert:
+            return self.model.objects.bulk_create(objects)
+        if not self.update_fields:
+            return self.model.objects.bulk_create(objects,
+                                                  ignore_conflicts=True)
+        return self.model.objects.bulk_create(
+            objects, update_conflicts=True,
+            unique_fields=self.unique_fields,
+            update_fields=self.update_fields)
+
+
+CSV_TABLES = (
+    CsvTable('users', User,
+             update_fields=('username', 'email', 'role', 'bio', 'first_name',
+                            'last_name', 'modified'),
+             defaults={'password': make_password(None)}),
+    CsvTable('category', Category, unique_fields=('slug', ),
+             update_fields=('name', )),
+    CsvTable('genre', Genre, update_fields=('name', 'slug')),
+    CsvTable('titles', Title,
+             update_fields=('name', 'year', 'description', 'category',
+                            'modified'),
+             foreign_keys={'category_id': 'category'},
+             optional_keys=('category_id', )),
+    CsvTable('genre_title', Title.genre.through,
+             foreign_keys={'title_id': 'titles', 'genre_id': 'genre'},
+             mapped=False),
+    CsvTable('review', Review,
+             update_fields=('text', 'score', 'pub_date', 'author', 'title',
+                            'modified'),
+             foreign_keys={'author_id': 'users', 'title_id': 'titles'}),
+    CsvTable('comments', Comment,
+             update_fields=('text', 'pub_date', 'author', 'review',
+                            'modified'),
+             foreign_keys={'author_id': 'users', 'review_id': 'review'},
+             mapped=False),
+)
+
+
+class ImportResult:
+
+    def __init__(self, table):
+        self.table = table
+        self.rows = 0
+        self.skipped = 0
+        self.skipped_rows = []
+        self.batches = 0
+        self.seconds = 0.0
+        self.resumed_from = 0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def skip(self, rows):
+        self.skipped += len(rows)
+        self.skipped_rows += rows[:SKIPPED_ROWS_REPORTED
+                                  - len(self.skipped_rows)]
+
+
+class CsvImporter:
+
+    def __init__(self, path, batch_size=1000, tables=CSV_TABLES, workers=1,
+                 resume=False, upsert=False, defer_indexes=False,
+                 relaxed_pragmas=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.tables = tables
+        self.workers = workers
+        self.resume = resume
+        self.upsert = upsert
+        self.defer_indexes = defer_indexes
+        self.relaxed_pragmas = (relaxed_pragmas
+                                and connection.vendor == 'sqlite')
+        self.ids = {}
+        self.pool = None
+
+    def run(self):
+        saved_pragmas = self.set_pragmas(RELAXED_PRAGMAS)
+        if self.defer_indexes:
+            self.drop_indexes()
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers)
+        try:
+            for table in self.tables:
+                path = self.path / table.filename
+                if path.exists():
+                    yield self.load(table, path)
+                if table.mapped:
+                    self.ids[table.name] = table.get_id_map(path)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+            if self.defer_indexes:
+                self.create_indexes()
+            self.set_pragmas(saved_pragmas)
+        self.finish()
+
+    def get_checkpoint(self, path):
+        stat = path.stat()
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=str(path.resolve()))
+        if not self.resume:
+            checkpoint.offset = checkpoint.batch = 0
+            checkpoint.rows = checkpoint.skipped = 0
+            checkpoint.completed = False
+        elif (checkpoint.offset and (
+                checkpoint.file_size != stat.st_size
+                or checkpoint.file_mtime != stat.st_mtime)):
+            raise ImportFailed(
+                f'{path.name} изменился после сохранения контрольной точки')
+        checkpoint.file_size = stat.st_size
+        checkpoint.file_mtime = stat.st_mtime
+        checkpoint.save()
+        return checkpoint
+
+    def load(self, table, path):
+        result = ImportResult(table)
+        checkpoint = self.get_checkpoint(path)
+        result.resumed_from = checkpoint.batch
+        if checkpoint.completed:
+            return result
+        started = time.perf_counter()
+        with open(path, 'rb') as file:
+            header = read_header(file)
+            if checkpoint.offset:
+                file.seek(checkpoint.offset)
+            for rows, invalid, offset in self.parse(
+                    table, header, read_blocks(file, self.batch_size)):
+                self.write(table, rows, invalid, offset, checkpoint, result)
+        checkpoint.completed = True
+        checkpoint.save(update_fields=['completed', 'modified'])
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def parse(self, table, header, blocks):
+        if self.pool is None:
+            for block, offset in blocks:
+                yield *parse_block(table.name, header, block), offset
+            return
+        pending = deque()
+        for block, offset in blocks:
+            pending.append((self.pool.submit(
+                parse_block, table.name, header, block), offset))
+            if len(pending) >= self.workers * 2:
+                future, offset = pending.popleft()
+                yield *future.result(), offset
+        while pending:
+            future, offset = pending.popleft()
+            yield *future.result(), offset
+
+    def write(self, table, rows, invalid, offset, checkpoint, result):
+        objects, skipped = [], list(invalid)
+        for values in rows:
+            try:
+                objects.append(table.build(values, self.ids))
+            except ValueError as error:
+                skipped.append((get_row_key(values), str(error)))
+        with transaction.atomic():
+            if objects:
+                table.bulk_create(objects, self.upsert)
+            checkpoint.offset = offset
+            checkpoint.batch += 1
+            checkpoint.rows += len(objects)
+            checkpoint.skipped += len(skipped)
+            checkpoint.save(update_fields=['offset', 'batch', 'rows',
+                                           'skipped', 'modified'])
+        result.rows += len(objects)
+        result.skip(skipped)
+        result.batches += 1
+
+    def set_pragmas(self, pragmas):
+        if not self.relaxed_pragmas:
+            return {}
+        saved = {}
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}')
+                saved[name] = cursor.fetchone()[0]
+                cursor.execute(f'PRAGMA {name} = {value}')
+        return saved
+
+    def get_indexes(self):
+        return [(table.model, index) for table in self.tables
+                for index in table.model._meta.indexes]
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model, index in self.get_indexes():
+                editor.remove_index(model, index)
+        drop_search_index(connection)
+
+    def create_indexes(self):
+        with connection.schema_editor() as editor:
+            for model, index in self.get_indexes():
+                editor.add_index(model, index)
+        rebuild_search_index(connection)
+
+    def finish(self):
+        models = [table.model for table in self.tables]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        recalculate_title_ratings()
+        rebuild_title_stats()
+        rebuild_title_ranks()
+        recount_category_titles()
+        recount_genre_titles()
+        bump_collection_versions(CATEGORIES, GENRES, TITLES, CATALOGUE)
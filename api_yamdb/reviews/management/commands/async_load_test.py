@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.benchmarks import HANDLER_MODES, concurrency_load
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает, сколько GET-запросов в секунду один рабочий '
+            'процесс отдаёт медленным клиентам через синхронные '
+            'представления (WSGI) и асинхронные (ASGI)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path',
+                            default='/api/v1/titles/',
+                            help='Запрашиваемый адрес')
+        parser.add_argument('--clients',
+                            type=int,
+                            default=100,
+                            help='Число одновременных клиентов')
+        parser.add_argument('--requests',
+                            type=int,
+                            default=400,
+                            help='Число запросов в каждом режиме')
+        parser.add_argument('--threads',
+                            type=int,
+                            default=4,
+                            help='Число потоков синхронного процесса')
+        parser.add_argument('--client-delay',
+                            type=float,
+                            default=0.1,
+                            help='Сколько секунд клиент читает ответ')
+
+    def handle(self, *args, **options):
+        if (options['clients'] < 1 or options['requests'] < 1
+                or options['threads'] < 1 or options['client_delay'] < 0):
+            raise CommandError('Число клиентов, запросов и потоков должно '
+                               'быть положительным')
+        requests = {}
+        for mode in HANDLER_MODES:
+            result = concurrency_load(
+                options['path'], mode, options['clients'],
+                options['requests'], options['threads'],
+                options['client_delay'])
+            requests[mode] = result['requests_per_second']
+            self.stdout.write(
+                f'{mode}: запросов {result["requests_per_second"]:.0f}/с, '
+                f'ошибок {result["errors"]}')
+        if requests['sync']:
+            self.stdout.write(
+                'async/sync: запросов '
+                f'x{requests["async"] / requests["sync"]:.2f}')
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Title
+from reviews.utils import (
+    find_inconsistent_title_ratings,
+    recalculate_title_ratings,
+)
+
+
+class Command(BaseCommand):
+    help = ('Сверяет сохранённый рейтинг произведений '
+            'с Avg(reviews__score) и при необходимости исправляет его')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix',
+                            action='store_true',
+                            help='Пересчитать рейтинг расходящихся записей')
+
+    def handle(self, *args, **options):
+        broken = list(find_inconsistent_title_ratings())
+        for title in broken:
+            self.stdout.write(
+                f'{title.pk}: сохранено {title.rating} '
+                f'({title.review_count} отз.), '
+                f'ожидается {title.expected_rating} '
+                f'({title.expected_count} отз.)')
+
+        if not broken:
+            self.stdout.write(self.style.SUCCESS('Рейтинги согласованы'))
+            return
+
+        if not options['fix']:
+            raise CommandError(
+                f'Рейтинг расходится у {len(broken)} произведений')
+
+        fixed = recalculate_title_ratings(
+            Title.objects.filter(pk__in=[title.pk for title in broken]))
+        self.stdout.write(self.style.SUCCESS(f'Исправлено: {fixed}'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.benchmarks import explain_lookups
+
+
+class Command(BaseCommand):
+    help = ('Показывает EXPLAIN QUERY PLAN и время горячих запросов '
+            'до и после индексов для поиска отзывов, комментариев '
+            'и пользователей')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed',
+                            type=int,
+                            default=0,
+                            help='Добавить на время замера указанное число '
+                                 'произведений с отзывами и комментариями')
+        parser.add_argument('--repeat',
+                            type=int,
+                            default=20,
+                            help='Сколько раз выполнить каждый запрос')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite')
+        if options['seed'] < 0 or options['repeat'] < 1:
+            raise CommandError('Число произведений и повторов должно быть '
+                               'положительным')
+        results = explain_lookups(options['seed'], options['repeat'])
+        for name, (before, after) in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, (plan, elapsed) in (('до', before), ('после', after)):
+                self.stdout.write(f'  {label}: {elapsed:.3f} мс')
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reviews.exporters import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    EXPORTS,
+    export,
+    parse_since,
+)
+
+
+class Command(BaseCommand):
+    help = ('Выгружает произведения, отзывы, комментарии или пользователей '
+            'в формате NDJSON или CSV')
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=list(EXPORTS))
+        parser.add_argument('--format',
+                            dest='export_format',
+                            choices=EXPORT_FORMATS,
+                            default=EXPORT_FORMATS[0])
+        parser.add_argument('--since',
+                            help='Выгрузить только записи, изменённые '
+                                 'начиная с указанной даты')
+        parser.add_argument('--output',
+                            help='Файл для выгрузки, по умолчанию stdout')
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since:
+            try:
+                since = parse_since(since)
+            except ValueError as error:
+                raise CommandError(error)
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+
+        started = timezone.now()
+        chunks = export(options['resource'], options['export_format'],
+                        since or None, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        self.stderr.write(f'Следующая выгрузка: --since {started.isoformat()}')
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from reviews.importers import CsvImporter, ImportFailed
+
+
+class Command(BaseCommand):
+    help = ('Загружает CSV-файлы из static/data в базу данных '
+            'в порядке зависимостей между таблицами')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path',
+                            type=Path,
+                            default=settings.BASE_DIR / 'static' / 'data',
+                            help='Каталог с CSV-файлами')
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help='Количество строк в одной транзакции')
+        parser.add_argument('--workers',
+                            type=int,
+                            default=1,
+                            help='Число процессов для разбора CSV')
+        parser.add_argument('--resume',
+                            action='store_true',
+                            help='Продолжить с последней контрольной точки')
+        parser.add_argument('--upsert',
+                            action='store_true',
+                            help='Обновлять существующие записи по id '
+                                 'или slug вместо ошибки')
+        parser.add_argument('--defer-indexes',
+                            action='store_true',
+                            help='Удалить индексы на время загрузки и '
+                                 'построить их заново в конце')
+        parser.add_argument('--relaxed-pragmas',
+                            action='store_true',
+                            help='Отключить синхронную запись SQLite '
+                                 'на время загрузки')
+
+    def handle(self, *args, **options):
+        if not options['path'].is_dir():
+            raise CommandError(f'Каталог {options["path"]} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        if options['workers'] < 1:
+            raise CommandError('Число процессов должно быть положительным')
+
+        importer = CsvImporter(
+            options['path'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            resume=options['resume'],
+            upsert=options['upsert'],
+            defer_indexes=options['defer_indexes'],
+            relaxed_pragmas=options['relaxed_pragmas'],
+        )
+        try:
+            for result in importer.run():
+                self.write_result(result)
+        except (ImportFailed, IntegrityError) as error:
+            raise CommandError(f'Ошибка загрузки: {error}')
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def write_result(self, result):
+        filename = result.table.filename
+        if not result.batches and result.resumed_from:
+            self.stdout.write(f'{filename}: уже загружен')
+            return
+        resumed = (f', продолжено с пакета {result.resumed_from}'
+                   if result.resumed_from else '')
+        self.stdout.write(
+            f'{filename}: {result.rows} строк, '
+            f'пропущено {result.skipped}, '
+            f'{result.batches} пакетов{resumed}, '
+            f'{result.seconds:.2f} с, '
+            f'{result.rows_per_second:.0f} строк/с')
+        for key, reason in result.skipped_rows:
+            self.stdout.write(f'  {key or "?"}: {reason}')
+        unreported = result.skipped - len(result.skipped_rows)
+        if unreported:
+            self.stdout.write(f'  … и ещё {unreported}')
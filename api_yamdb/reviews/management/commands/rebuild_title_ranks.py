@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.utils import get_ranking_prior, rebuild_title_ranks
+
+
+class Command(BaseCommand):
+    help = ('Полностью пересчитывает рейтинг лучших произведений: '
+            'среднюю оценку по всем отзывам и места всех произведений. '
+            'Запускайте периодически, например из cron')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ranked = rebuild_title_ranks()
+        prior = get_ranking_prior()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано: {ranked}, C = {prior.mean:.3f}, '
+            f'm = {prior.min_reviews}'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.utils import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает распределение оценок произведений по отзывам: '
+            'заполняет недостающие сводки и исправляет расхождения')
+
+    def add_arguments(self, parser):
+        parser.add_argument('titles',
+                            nargs='*',
+                            type=int,
+                            help='id произведений, по умолчанию все')
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        if options['titles']:
+            titles = titles.filter(pk__in=options['titles'])
+        with transaction.atomic():
+            rebuilt = rebuild_title_stats(titles)
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано: {rebuilt}'))
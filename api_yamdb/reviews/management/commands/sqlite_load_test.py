@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.benchmarks import SQLITE_PROFILES, sqlite_load
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite с настройками '
+            'по умолчанию и в профиле production при одновременном '
+            'чтении и записи отзывов во временной базе')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds',
+                            type=float,
+                            default=5.0,
+                            help='Длительность нагрузки на каждый профиль')
+        parser.add_argument('--readers',
+                            type=int,
+                            default=4,
+                            help='Число читающих потоков')
+        parser.add_argument('--writers',
+                            type=int,
+                            default=2,
+                            help='Число пишущих потоков')
+
+    def handle(self, *args, **options):
+        if (options['seconds'] <= 0 or options['readers'] < 1
+                or options['writers'] < 1):
+            raise CommandError('Длительность и число потоков должны быть '
+                               'положительными')
+        reads = {}
+        for profile in SQLITE_PROFILES:
+            result = sqlite_load(profile, options['seconds'],
+                                 options['readers'], options['writers'])
+            reads[profile] = result['reads_per_second']
+            self.stdout.write(
+                f'{profile}: чтений {result["reads_per_second"]:.0f}/с, '
+                f'записей {result["writes_per_second"]:.0f}/с, '
+                f'блокировок {result["locked"]}')
+        if reads['default']:
+            self.stdout.write(
+                'production/default: чтений '
+                f'x{reads["production"] / reads["default"]:.2f}')
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:16
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+
+def backfill_title_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(rating=Cast('rating_sum', FloatField())
+                         / NullIf(F('review_count'), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_title_rating_sum_review_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_title_rating,
+                             migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-rating', 'id'], name='title_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+from ._search_triggers import TITLE_TRIGGERS
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING "
+        "fts5(name, description, content='reviews_title', "
+        "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        *TITLE_TRIGGERS,
+        "INSERT INTO reviews_title_fts(reviews_title_fts) "
+        "VALUES ('delete-all')",
+        "INSERT INTO reviews_title_fts(rowid, name, description) "
+        "SELECT reviews_title.id, "
+        "replace(replace(reviews_title.name, 'ё', 'е'), 'Ё', 'Е'), "
+        "replace(replace(reviews_title.description, 'ё', 'е'), 'Ё', 'Е') "
+        "FROM reviews_title",
+    ],
+    'postgresql': [
+        "CREATE INDEX IF NOT EXISTS reviews_title_search_idx "
+        "ON reviews_title USING GIN ((to_tsvector('russian'::regconfig, "
+        "translate(coalesce(\"reviews_title\".\"name\", '') || ' ' || "
+        "coalesce(\"reviews_title\".\"description\", ''), 'ёЁ', 'еЕ'))))",
+    ],
+}
+DROP_SQL = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+        'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+        'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+        'DROP TABLE IF EXISTS reviews_title_fts',
+    ],
+    'postgresql': [
+        'DROP INDEX IF EXISTS reviews_title_search_idx',
+    ],
+}
+
+
+def run_sql(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement, params=None)
+
+
+def create_title_search_index(apps, schema_editor):
+    run_sql(schema_editor, CREATE_SQL)
+
+
+def remove_title_search_index(apps, schema_editor):
+    run_sql(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_title_rating_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_search_index,
+                             remove_title_search_index),
+    ]
@@ -0,0 +1,79 @@
+from django.db import migrations
+
+from ._search_triggers import COMMENT_TRIGGERS, REVIEW_TRIGGERS
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_review_fts USING "
+        "fts5(text, content='reviews_review', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        *REVIEW_TRIGGERS,
+        "INSERT INTO reviews_review_fts(reviews_review_fts) "
+        "VALUES ('delete-all')",
+        "INSERT INTO reviews_review_fts(rowid, text) "
+        "SELECT reviews_review.id, "
+        "replace(replace(reviews_review.text, 'ё', 'е'), 'Ё', 'Е') "
+        "FROM reviews_review",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_comment_fts USING "
+        "fts5(text, content='reviews_comment', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        *COMMENT_TRIGGERS,
+        "INSERT INTO reviews_comment_fts(reviews_comment_fts) "
+        "VALUES ('delete-all')",
+        "INSERT INTO reviews_comment_fts(rowid, text) "
+        "SELECT reviews_comment.id, "
+        "replace(replace(reviews_comment.text, 'ё', 'е'), 'Ё', 'Е') "
+        "FROM reviews_comment",
+    ],
+    'postgresql': [
+        "CREATE INDEX IF NOT EXISTS reviews_review_search_idx "
+        "ON reviews_review USING GIN ((to_tsvector('russian'::regconfig, "
+        "translate(coalesce(\"reviews_review\".\"text\", ''), "
+        "'ёЁ', 'еЕ'))))",
+        "CREATE INDEX IF NOT EXISTS reviews_comment_search_idx "
+        "ON reviews_comment USING GIN ((to_tsvector('russian'::regconfig, "
+        "translate(coalesce(\"reviews_comment\".\"text\", ''), "
+        "'ёЁ', 'еЕ'))))",
+    ],
+}
+DROP_SQL = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS reviews_review_fts_insert',
+        'DROP TRIGGER IF EXISTS reviews_review_fts_update',
+        'DROP TRIGGER IF EXISTS reviews_review_fts_delete',
+        'DROP TABLE IF EXISTS reviews_review_fts',
+        'DROP TRIGGER IF EXISTS reviews_comment_fts_insert',
+        'DROP TRIGGER IF EXISTS reviews_comment_fts_update',
+        'DROP TRIGGER IF EXISTS reviews_comment_fts_delete',
+        'DROP TABLE IF EXISTS reviews_comment_fts',
+    ],
+    'postgresql': [
+        'DROP INDEX IF EXISTS reviews_review_search_idx',
+        'DROP INDEX IF EXISTS reviews_comment_search_idx',
+    ],
+}
+
+
+def run_sql(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement, params=None)
+
+
+def create_text_search_index(apps, schema_editor):
+    run_sql(schema_editor, CREATE_SQL)
+
+
+def remove_text_search_index(apps, schema_editor):
+    run_sql(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0017_title_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_text_search_index,
+                             remove_text_search_index),
+    ]
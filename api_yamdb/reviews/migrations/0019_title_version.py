@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:28
+
+from django.db import migrations, models
+
+from ._search_triggers import TITLE_TRIGGERS, install_triggers
+
+
+def reinstall_title_search_triggers(apps, schema_editor):
+    install_triggers(schema_editor, TITLE_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0018_review_comment_search_index'),
+    ]
+
+    operations = [
+        # При откате таблица пересоздаётся после остальных операций.
+        migrations.RunPython(migrations.RunPython.noop,
+                             reinstall_title_search_triggers),
+        migrations.AddField(
+            model_name='title',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(reinstall_title_search_triggers,
+                             reinstall_title_search_triggers),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:31
+
+from django.db import migrations, models
+
+COLLECTIONS = ('categories', 'genres', 'titles')
+
+
+def create_collection_versions(apps, schema_editor):
+    CollectionVersion = apps.get_model('reviews', 'CollectionVersion')
+    CollectionVersion.objects.bulk_create(
+        [CollectionVersion(name=name) for name in COLLECTIONS],
+        ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_title_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_collection_versions,
+                             migrations.RunPython.noop),
+    ]
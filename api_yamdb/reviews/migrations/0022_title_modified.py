@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+from ._search_triggers import TITLE_TRIGGERS, install_triggers
+
+
+def reinstall_title_search_triggers(apps, schema_editor):
+    install_triggers(schema_editor, TITLE_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0021_importcheckpoint'),
+    ]
+
+    operations = [
+        # При откате таблица пересоздаётся после остальных операций.
+        migrations.RunPython(migrations.RunPython.noop,
+                             reinstall_title_search_triggers),
+        migrations.AddField(
+            model_name='title',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['modified'], name='title_modified_idx'),
+        ),
+        migrations.RunPython(reinstall_title_search_triggers,
+                             reinstall_title_search_triggers),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import (
+    Avg,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce, Now
+
+from ._search_triggers import REVIEW_TRIGGERS, install_triggers
+
+
+def delete_duplicate_reviews(apps, schema_editor):
+    # Остаётся первый отзыв автора, рейтинг затронутых произведений
+    # пересчитывается заново.
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    duplicates = Review.objects.exclude(
+        pk__in=Review.objects.values('author', 'title').annotate(
+            first_id=Min('pk')).values('first_id'))
+    title_ids = set(duplicates.values_list('title_id', flat=True))
+    if not title_ids:
+        return
+    duplicates.delete()
+    reviews = Review.objects.filter(
+        title_id=OuterRef('pk')).order_by().values('title_id')
+    Title.objects.filter(pk__in=title_ids).update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()), 0),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'),
+                     output_field=IntegerField()), 0),
+        rating=Subquery(reviews.annotate(total=Avg('score')).values('total'),
+                        output_field=FloatField()),
+        version=F('version') + 1,
+        modified=Now(),
+    )
+
+
+def reinstall_review_search_triggers(apps, schema_editor):
+    install_triggers(schema_editor, REVIEW_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0023_review_comment_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # При откате таблица пересоздаётся после остальных операций.
+        migrations.RunPython(migrations.RunPython.noop,
+                             reinstall_review_search_triggers),
+        migrations.RunPython(delete_duplicate_reviews,
+                             migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_author_title_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('author', 'title'), name='review_author_title_unique'),
+        ),
+        migrations.RunPython(reinstall_review_search_triggers,
+                             reinstall_review_search_triggers),
+    ]
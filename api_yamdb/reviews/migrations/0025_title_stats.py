@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {title_id: TitleStats(title_id=title_id)
+             for title_id in Title.objects.values_list('pk', flat=True)}
+    counts = Review.objects.filter(score__in=range(1, 11)).order_by(
+    ).values_list('title_id', 'score').annotate(number=Count('pk'))
+    for title_id, score, number in counts:
+        setattr(stats[title_id], f'score_{score}', number)
+    TitleStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0024_review_author_title_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title')),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_title_ranks(apps, schema_editor):
+    RankingPrior = apps.get_model('reviews', 'RankingPrior')
+    Title = apps.get_model('reviews', 'Title')
+    TitleRank = apps.get_model('reviews', 'TitleRank')
+    totals = Title.objects.aggregate(rating_sum=Sum('rating_sum'),
+                                     review_count=Sum('review_count'))
+    if not totals['review_count']:
+        # Без отзывов C не сохраняем: его посчитает первый отзыв.
+        return
+    prior = RankingPrior.objects.create(
+        mean=totals['rating_sum'] / totals['review_count'],
+        min_reviews=settings.TITLE_RANK_MIN_REVIEWS,
+    )
+    prior_sum = prior.min_reviews * prior.mean
+    TitleRank.objects.bulk_create(
+        TitleRank(title_id=title_id, category_id=category_id,
+                  weighted_rating=(rating_sum + prior_sum)
+                  / (review_count + prior.min_reviews))
+        for title_id, category_id, rating_sum, review_count
+        in Title.objects.filter(review_count__gt=0).values_list(
+            'pk', 'category_id', 'rating_sum', 'review_count').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0025_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField()),
+                ('min_reviews', models.PositiveIntegerField()),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TitleRank',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='reviews.title')),
+                ('weighted_rating', models.FloatField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-weighted_rating', 'title'], name='title_rank_idx'), models.Index(fields=['category', '-weighted_rating', 'title'], name='title_rank_category_idx')],
+            },
+        ),
+        migrations.RunPython(fill_title_ranks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:37
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_title_counters(apps, schema_editor):
+    Category = apps.get_model('reviews', 'Category')
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    for model, links in (
+        (Category, Title.objects.filter(category_id=OuterRef('pk')).order_by(
+        ).values('category_id')),
+        (Genre, Title.genre.through.objects.filter(
+            genre_id=OuterRef('pk')).order_by().values('genre_id')),
+    ):
+        model.objects.update(title_count=Coalesce(
+            Subquery(links.annotate(total=Count('pk')).values('total'),
+                     output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0026_title_ranks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='title_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='title_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_title_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+from ._search_triggers import (
+    COMMENT_TRIGGERS,
+    REVIEW_TRIGGERS,
+    install_triggers,
+)
+
+
+def fill_modified(apps, schema_editor):
+    # Старые записи считаются изменёнными в момент публикации.
+    for name in ('Review', 'Comment'):
+        apps.get_model('reviews', name).objects.update(modified=F('pub_date'))
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    install_triggers(schema_editor, REVIEW_TRIGGERS, COMMENT_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0027_title_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # При откате таблица пересоздаётся после остальных операций.
+        migrations.RunPython(migrations.RunPython.noop,
+                             reinstall_search_triggers),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['modified'], name='comment_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['modified'], name='review_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ),
+        migrations.RunPython(fill_modified, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_triggers,
+                             reinstall_search_triggers),
+    ]
@@ -0,0 +1,74 @@
+# Замороженный SQL триггеров поиска: правки reviews.search его не меняют.
+
+TITLE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert "
+    "AFTER INSERT ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts(rowid, name, description) "
+    "VALUES (new.id, replace(replace(new.name, 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(new.description, 'ё', 'е'), 'Ё', 'Е')); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete "
+    "AFTER DELETE ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts"
+    "(reviews_title_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.name, 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(old.description, 'ё', 'е'), 'Ё', 'Е')); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update "
+    "AFTER UPDATE OF name, description ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_fts"
+    "(reviews_title_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.name, 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(old.description, 'ё', 'е'), 'Ё', 'Е')); "
+    "INSERT INTO reviews_title_fts(rowid, name, description) "
+    "VALUES (new.id, replace(replace(new.name, 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(new.description, 'ё', 'е'), 'Ё', 'Е')); END",
+]
+REVIEW_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_insert "
+    "AFTER INSERT ON reviews_review BEGIN "
+    "INSERT INTO reviews_review_fts(rowid, text) "
+    "VALUES (new.id, replace(replace(new.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_delete "
+    "AFTER DELETE ON reviews_review BEGIN "
+    "INSERT INTO reviews_review_fts(reviews_review_fts, rowid, text) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.text, 'ё', 'е'), 'Ё', 'Е')); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_review_fts_update "
+    "AFTER UPDATE OF text ON reviews_review BEGIN "
+    "INSERT INTO reviews_review_fts(reviews_review_fts, rowid, text) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "INSERT INTO reviews_review_fts(rowid, text) "
+    "VALUES (new.id, replace(replace(new.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "END",
+]
+COMMENT_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS reviews_comment_fts_insert "
+    "AFTER INSERT ON reviews_comment BEGIN "
+    "INSERT INTO reviews_comment_fts(rowid, text) "
+    "VALUES (new.id, replace(replace(new.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_comment_fts_delete "
+    "AFTER DELETE ON reviews_comment BEGIN "
+    "INSERT INTO reviews_comment_fts(reviews_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.text, 'ё', 'е'), 'Ё', 'Е')); END",
+    "CREATE TRIGGER IF NOT EXISTS reviews_comment_fts_update "
+    "AFTER UPDATE OF text ON reviews_comment BEGIN "
+    "INSERT INTO reviews_comment_fts(reviews_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, "
+    "replace(replace(old.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "INSERT INTO reviews_comment_fts(rowid, text) "
+    "VALUES (new.id, replace(replace(new.text, 'ё', 'е'), 'Ё', 'Е')); "
+    "END",
+]
+
+
+def install_triggers(schema_editor, *statement_lists):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statements in statement_lists:
+            for statement in statements:
+                schema_editor.execute(statement, params=None)
+
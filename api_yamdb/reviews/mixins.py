@@ -0,0 +1,126 @@
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotFound
+
+from .utils import get_collection_version, retry_on_locked
+
+
+def make_etag(collection_name, version, key):
+    digest = hashlib.md5(key.encode(), usedforsecurity=False)
+    return quote_etag(
+        f'{collection_name}-{version}-{digest.hexdigest()[:16]}')
+
+
+def patch_conditional_headers(response, etag, last_modified, cache_control):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, **cache_control)
+    patch_vary_headers(response, ['Accept'])
+
+
+class ConditionalGetMixin:
+    collection_name = None
+    object_version_field = None
+    cache_control = {'max_age': 0, 'must_revalidate': True}
+
+    def is_conditional(self):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        stamp = self.is_conditional() and get_collection_version(
+            self.collection_name)
+        if not stamp:
+            return super().list(request, *args, **kwargs)
+        return self.get_conditional_response(
+            self.get_etag(stamp.version, request.get_full_path()),
+            stamp.modified,
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_conditional():
+            return super().retrieve(request, *args, **kwargs)
+        if self.object_version_field is None:
+            stamp = get_collection_version(self.collection_name)
+            version = stamp and stamp.version
+            last_modified = stamp and stamp.modified
+        else:
+            version = self.get_object_version()
+            last_modified = None
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.get_conditional_response(
+            self.get_etag(version, request.get_full_path()),
+            last_modified,
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs),
+        )
+
+    def get_object_version(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        ).values_list(self.object_version_field, flat=True).first()
+
+    def get_etag(self, version, key):
+        return make_etag(self.collection_name, version,
+                         f'{key}|{self.request.accepted_media_type}')
+
+    def get_conditional_response(self, etag, last_modified, get_response):
+        response = get_conditional_response(
+            self.request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is None:
+            response = get_response()
+            if response.status_code != 200:
+                return response
+        patch_conditional_headers(response, etag, last_modified,
+                                  self.cache_control)
+        return response
+
+
+class NestedParentMixin:
+    """Находит родителя вложенного маршрута одним запросом, проверяя
+    всю цепочку идентификаторов из URL, и запоминает его до конца запроса.
+    """
+    parent_model = None
+    parent_lookups = {}
+    parent_not_found = None
+
+    def get_parent(self):
+        if getattr(self, '_parent', None) is None:
+            self._parent = self.parent_model.objects.filter(**{
+                field: self.kwargs[url_kwarg]
+                for field, url_kwarg in self.parent_lookups.items()
+            }).first()
+            if self._parent is None:
+                raise NotFound(self.parent_not_found)
+        return self._parent
+
+
+class LockRetryMixin:
+    """Выполняет создание, изменение и удаление в отдельной транзакции
+    и повторяет её, если база занята другим писателем."""
+    lock_retry_atomic = True
+
+    def create(self, request, *args, **kwargs):
+        return retry_on_locked(super().create, request, *args,
+                               atomic=self.lock_retry_atomic, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return retry_on_locked(super().update, request, *args,
+                               atomic=self.lock_retry_atomic, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return retry_on_locked(super().destroy, request, *args,
+                               atomic=self.lock_retry_atomic, **kwargs)
@@ -1,12 +1,20 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+# Правки каталога (поля произведений, жанры, категории) без рейтингов.
+CATALOGUE = 'catalogue'
+SCORES = range(1, 11)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=256)
     slug = models.SlugField(max_length=50, unique=True)
+    title_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -15,6 +23,7 @@ class Category(models.Model):
 class Genre(models.Model):
     name = models.CharField(max_length=256)
     slug = models.SlugField(max_length=50, unique=True)
+    title_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -36,10 +45,126 @@ class Title(models.Model):
         blank=True,
         related_name='titles',
     )
+    rating_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    rating = models.FloatField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating', 'id'], name='title_rating_idx'),
+            models.Index(fields=['category', '-rating', 'id'],
+                         name='title_category_rating_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+            models.Index(fields=['modified'], name='title_modified_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
+
+class TitleStats(models.Model):
+    """Распределение оценок произведения: по счётчику на каждую оценку,
+    обновляется вместе с записью отзыва."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.title_id}: {self.count}'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(score * number
+                   for score, number in self.histogram.items()) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle, seen, lower = (count - 1) // 2, 0, None
+        for score, number in self.histogram.items():
+            seen += number
+            if lower is None and seen > middle:
+                lower = score
+            if seen > count // 2:
+                return (lower + score) / 2
+
+
+class TitleRank(models.Model):
+    """Место произведения в рейтинге: байесовская оценка
+    (rating_sum + m * C) / (review_count + m), где C и m берутся
+    из RankingPrior. Строки есть только у произведений с отзывами."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    weighted_rating = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-weighted_rating', 'title'],
+                         name='title_rank_idx'),
+            models.Index(fields=['category', '-weighted_rating', 'title'],
+                         name='title_rank_category_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.weighted_rating}'
+
+
+class RankingPrior(models.Model):
+    """Средняя оценка по всем отзывам C и вес m на момент последнего
+    полного пересчёта рейтинга."""
+    mean = models.FloatField()
+    min_reviews = models.PositiveIntegerField()
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.mean} ({self.min_reviews})'
+
 
 class Review(models.Model):
     text = models.TextField()
@@ -52,13 +177,49 @@ class Review(models.Model):
     )
     score = models.IntegerField()
     pub_date = models.DateTimeField(blank=True)
+    modified = models.DateTimeField(auto_now=True)
     title = models.ForeignKey(Title,
                               on_delete=models.CASCADE,
                               related_name='reviews')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_date_idx'),
+            models.Index(fields=['modified'], name='review_modified_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'title'],
+                                    name='review_author_title_unique'),
+        ]
+
     def __str__(self):
         return f'{self.text}: {self.author}'
 
+    def get_stored_score(self):
+        """Оценка, сохранённая в БД, под блокировкой строки до конца
+        транзакции; None, если отзыва уже нет."""
+        return Review.objects.select_for_update().filter(
+            pk=self.pk).values_list('score', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        # Рейтинг меняется на разницу с оценкой из БД, а не с загруженной
+        # в объект: иначе две правки по одной старой оценке сложатся.
+        with transaction.atomic():
+            if not self._state.adding:
+                self._loaded_score = self.get_stored_score()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # Сигнал post_delete приходит и тогда, когда строку уже удалил
+        # параллельный запрос: рейтинг меняем, только если отзыв ещё есть.
+        with transaction.atomic():
+            score = self.get_stored_score()
+            if score is None:
+                return 0, {}
+            self.score = score
+            return super().delete(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField()
@@ -70,9 +231,57 @@ class Comment(models.Model):
         related_name='comments',
     )
     pub_date = models.DateTimeField(blank=True)
+    modified = models.DateTimeField(auto_now=True)
     review = models.ForeignKey(Review,
                                on_delete=models.CASCADE,
                                related_name='comemnts')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_date_idx'),
+            models.Index(fields=['modified'], name='comment_modified_idx'),
+        ]
+
     def __str__(self):
         return f'{self.text}: {self.author}'
+
+
+class CollectionVersion(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class Tombstone(models.Model):
+    """Удалённая запись: по ним инкрементальная выгрузка сообщает
+    об удалениях."""
+    resource = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.resource}: {self.object_id}'
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField(max_length=1024, unique=True)
+    file_size = models.PositiveBigIntegerField(default=0)
+    file_mtime = models.FloatField(default=0)
+    offset = models.PositiveBigIntegerField(default=0)
+    batch = models.PositiveIntegerField(default=0)
+    rows = models.PositiveBigIntegerField(default=0)
+    skipped = models.PositiveBigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.batch} ({self.offset})'
@@ -0,0 +1,119 @@
+import csv
+import io
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+ROLES = ('user', 'moderator', 'admin')
+
+
+def parse_key(value):
+    return int(value) if value else None
+
+
+def parse_date(value):
+    value = parse_datetime(value)
+    if value is None:
+        raise ValueError('Неверный формат даты')
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def parse_user(row):
+    role = row['role'] or 'user'
+    if not row['username'] or role not in ROLES:
+        raise ValueError('Неверный пользователь')
+    return {'id': int(row['id']), 'username': row['username'],
+            'email': row['email'], 'role': role, 'bio': row['bio'],
+            'first_name': row['first_name'], 'last_name': row['last_name']}
+
+
+def parse_category(row):
+    if not row['slug']:
+        raise ValueError('Неверный формат названия сегмента')
+    return {'name': row['name'], 'slug': row['slug']}
+
+
+def parse_genre(row):
+    if not row['slug']:
+        raise ValueError('Неверный формат названия жанра')
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def parse_title(row):
+    return {'id': int(row['id']), 'name': row['name'],
+            'year': int(row['year']), 'description': row['description'],
+            'category_id': parse_key(row['category'])}
+
+
+def parse_genre_title(row):
+    return {'id': int(row['id']), 'title_id': int(row['title_id']),
+            'genre_id': int(row['genre_id'])}
+
+
+def parse_review(row):
+    score = int(row['score'])
+    if score < 1 or score > 10:
+        raise ValueError('Рейтинг может быть от 1 до 10')
+    return {'id': int(row['id']), 'text': row['text'], 'score': score,
+            'pub_date': parse_date(row['pub_date']),
+            'author_id': int(row['author_id']),
+            'title_id': int(row['title_id'])}
+
+
+def parse_comment(row):
+    return {'id': int(row['id']), 'text': row['text'],
+            'pub_date': parse_date(row['pub_date']),
+            'author_id': int(row['author_id']),
+            'review_id': int(row['review_id'])}
+
+
+PARSERS = {
+    'users': parse_user,
+    'category': parse_category,
+    'genre': parse_genre,
+    'titles': parse_title,
+    'genre_title': parse_genre_title,
+    'review': parse_review,
+    'comments': parse_comment,
+}
+
+
+def get_row_key(row):
+    return row.get('id') or row.get('slug')
+
+
+def parse_block(name, header, block):
+    """Разбирает пакет строк. Возвращает словари полей и пропущенные
+    строки парами (id или slug, причина)."""
+    parse = PARSERS[name]
+    rows, invalid = [], []
+    for row in csv.DictReader(io.StringIO(block, newline=''),
+                              fieldnames=header):
+        try:
+            rows.append(parse(row))
+        except KeyError as error:
+            invalid.append((get_row_key(row), f'нет столбца {error}'))
+        except (TypeError, ValueError) as error:
+            invalid.append((get_row_key(row), str(error)))
+    return rows, invalid
+
+
+def read_blocks(file, size):
+    lines, records, quotes = [], 0, 0
+    for line in iter(file.readline, b''):
+        lines.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        records += 1
+        if records == size:
+            yield b''.join(lines).decode('utf-8'), file.tell()
+            lines, records = [], 0
+    if lines:
+        yield b''.join(lines).decode('utf-8'), file.tell()
+
+
+def read_header(file):
+    return next(csv.reader([file.readline().decode('utf-8-sig')]))
@@ -0,0 +1,215 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, CharField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Review, Title
+
+SEARCH_CONFIG = 'russian'
+SNIPPET_START = '<mark>'
+SNIPPET_STOP = '</mark>'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_WORDS = 16
+STEM_MIN_LENGTH = 3
+RUSSIAN_ENDINGS = sorted((
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ией',
+    'иях', 'ях', 'ах', 'ов', 'ев', 'ей', 'ий', 'ый', 'ой', 'ая', 'яя', 'ое',
+    'ее', 'ые', 'ие', 'ую', 'юю', 'ам', 'ям', 'ом', 'ем', 'а', 'я', 'о', 'е',
+    'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True)
+
+
+def get_search_tokens(query):
+    return re.findall(r'\w+', query.lower().replace('ё', 'е'))
+
+
+def get_prefix_stem(token):
+    for ending in RUSSIAN_ENDINGS:
+        if (token.endswith(ending)
+                and len(token) - len(ending) >= STEM_MIN_LENGTH):
+            return token[:-len(ending)]
+    return token
+
+
+def _sqlite_fold(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _sqlite_values(row, fields):
+    return ', '.join([f'{row}.id'] + [
+        _sqlite_fold(f'{row}.{field}') for field in fields
+    ])
+
+
+def _sqlite_insert(fts_table, row, fields):
+    return (f'INSERT INTO {fts_table}(rowid, {", ".join(fields)}) '
+            f'VALUES ({_sqlite_values(row, fields)});')
+
+
+def _sqlite_delete(fts_table, row, fields):
+    return (f'INSERT INTO {fts_table}({fts_table}, rowid, '
+            f'{", ".join(fields)}) '
+            f"VALUES ('delete', {_sqlite_values(row, fields)});")
+
+
+def sqlite_trigger_sql(table, fields):
+    """Триггеры, которые обновляют FTS5-таблицу {table}_fts."""
+    fts_table = f'{table}_fts'
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_insert '
+        f'AFTER INSERT ON {table} '
+        f'BEGIN {_sqlite_insert(fts_table, "new", fields)} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_delete '
+        f'AFTER DELETE ON {table} '
+        f'BEGIN {_sqlite_delete(fts_table, "old", fields)} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_update '
+        f'AFTER UPDATE OF {", ".join(fields)} ON {table} '
+        f'BEGIN {_sqlite_delete(fts_table, "old", fields)} '
+        f'{_sqlite_insert(fts_table, "new", fields)} END',
+    ]
+
+
+class FullTextIndex:
+
+    def __init__(self, model, fields, weights=None):
+        self.table = model._meta.db_table
+        self.fts_table = f'{self.table}_fts'
+        self.fields = fields
+        self.weights = weights or (1.0, ) * len(fields)
+
+    @property
+    def row_id(self):
+        return f'"{self.table}"."id"'
+
+    @property
+    def document(self):
+        return " || ' ' || ".join(
+            f'coalesce("{self.table}"."{field}", \'\')'
+            for field in self.fields)
+
+    @property
+    def vector(self):
+        return (f"to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+                f"translate({self.document}, 'ёЁ', 'еЕ'))")
+
+    def install_sql(self, vendor):
+        if vendor == 'postgresql':
+            return [
+                f'CREATE INDEX IF NOT EXISTS {self.table}_search_idx '
+                f'ON {self.table} USING GIN (({self.vector}))'
+            ]
+        if vendor != 'sqlite':
+            return []
+        return [
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING '
+            f"fts5({', '.join(self.fields)}, content='{self.table}', "
+            f"content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')",
+        ] + sqlite_trigger_sql(self.table, self.fields)
+
+    def rebuild_sql(self, vendor):
+        if vendor != 'sqlite':
+            return []
+        return [
+            f"INSERT INTO {self.fts_table}({self.fts_table}) "
+            f"VALUES ('delete-all')",
+            f'INSERT INTO {self.fts_table}(rowid, {", ".join(self.fields)}) '
+            f'SELECT {_sqlite_values(self.table, self.fields)} '
+            f'FROM {self.table}',
+        ]
+
+    def drop_sql(self, vendor):
+        if vendor == 'postgresql':
+            return [f'DROP INDEX IF EXISTS {self.table}_search_idx']
+        if vendor != 'sqlite':
+            return []
+        return [
+            f'DROP TRIGGER IF EXISTS {self.fts_table}_{action}'
+            for action in ('insert', 'update', 'delete')
+        ] + [f'DROP TABLE IF EXISTS {self.fts_table}']
+
+    def search(self, queryset, query):
+        tokens = get_search_tokens(query)
+        if not tokens:
+            return queryset.none()
+        if connections[queryset.db].vendor == 'postgresql':
+            return self._search_postgresql(queryset, tokens)
+        return self._search_sqlite(queryset, tokens)
+
+    def ranked_search(self, queryset, query):
+        queryset = self.search(queryset, query)
+        if queryset.query.is_empty():
+            return queryset
+        return queryset.order_by('-search_rank', 'id')
+
+    def _search_sqlite(self, queryset, tokens):
+        match = ' '.join(f'"{get_prefix_stem(token)}"*' for token in tokens)
+        matches = f'FROM {self.fts_table} WHERE {self.fts_table} MATCH %s'
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid {matches}', (match, )),
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({self.fts_table}, {weights}) {matches} '
+                f'AND rowid = {self.row_id}', (match, ),
+                output_field=FloatField()),
+            search_snippet=RawSQL(
+                f'SELECT snippet({self.fts_table}, -1, %s, %s, %s, %s) '
+                f'{matches} AND rowid = {self.row_id}',
+                (SNIPPET_START, SNIPPET_STOP, SNIPPET_ELLIPSIS,
+                 SNIPPET_WORDS, match),
+                output_field=CharField()),
+        )
+
+    def _search_postgresql(self, queryset, tokens):
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}'::regconfig, %s)"
+        match = ' & '.join(f'{token}:*' for token in tokens)
+        headline_options = (f'StartSel={SNIPPET_START}, '
+                            f'StopSel={SNIPPET_STOP}, '
+                            f'MaxWords={SNIPPET_WORDS}, MinWords=5')
+        return queryset.filter(
+            RawSQL(f'{self.vector} @@ {tsquery}', (match, ),
+                   output_field=BooleanField()),
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank({self.vector}, {tsquery})',
+                               (match, ),
+                               output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"ts_headline('{SEARCH_CONFIG}'::regconfig, "
+                f'{self.document}, {tsquery}, %s)',
+                (match, headline_options),
+                output_field=CharField()),
+        )
+
+
+TITLE_SEARCH_INDEX = FullTextIndex(Title, ('name', 'description'),
+                                   weights=(10.0, 1.0))
+REVIEW_SEARCH_INDEX = FullTextIndex(Review, ('text', ))
+COMMENT_SEARCH_INDEX = FullTextIndex(Comment, ('text', ))
+SEARCH_INDEXES = (TITLE_SEARCH_INDEX, REVIEW_SEARCH_INDEX,
+                  COMMENT_SEARCH_INDEX)
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection, indexes=SEARCH_INDEXES):
+    tables = connection.introspection.table_names()
+    for index in indexes:
+        if index.table in tables:
+            _execute(connection, index.install_sql(connection.vendor))
+
+
+def rebuild_search_index(connection, indexes=SEARCH_INDEXES):
+    install_search_index(connection, indexes)
+    for index in indexes:
+        _execute(connection, index.rebuild_sql(connection.vendor))
+
+
+def drop_search_index(connection, indexes=SEARCH_INDEXES):
+    for index in indexes:
+        _execute(connection, index.drop_sql(connection.vendor))
@@ -1,17 +1,39 @@
 import re
 import datetime
+from collections import defaultdict
 
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import (
+    CATALOGUE,
+    TITLES,
     Category,
     Genre,
     Title,
+    TitleStats,
     Review,
     Comment,
 )
+from .cache import category_id_cache, genre_id_cache, title_cards
+from .utils import (
+    bump_collection_versions,
+    get_top_reviews,
+    recount_category_titles,
+    recount_genre_titles,
+    refresh_title_ranks,
+)
+
+from api.fieldsets import (
+    EXPAND_PARAM,
+    SparseFieldsSerializerMixin,
+    parse_expand,
+)
 
-from .utils import calculate_title_rating
+REVIEWS_EXPAND_LIMIT = 3
+REVIEWS_EXPAND_MAX_LIMIT = 20
+REVIEWS_EXPAND_ORDERS = ('pub_date', '-pub_date', 'score', '-score')
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -47,15 +69,26 @@ class GenreSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    category = serializers.StringRelatedField(read_only=True)
-    genre = serializers.StringRelatedField(read_only=True, many=True)
-    review = serializers.StringRelatedField(read_only=True, many=True)
+class TitleListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        return self.child.to_representation_many(list(data))
+
+
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+    genre = GenreSerializer(read_only=True, many=True)
+    rating = serializers.FloatField(read_only=True)
+    sparse_extra_fields = ('snippet', )
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'description', 'genre', 'category',
-                  'review')
+                  'rating')
+        list_serializer_class = TitleListSerializer
 
     def validate_rating(self, value):
         if value < 0 or value > 10:
@@ -73,9 +106,24 @@ class TitleSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Неверный формат года')
         return attrs
 
+    def get_genre_slugs(self):
+        if hasattr(self.initial_data, 'getlist'):
+            return self.initial_data.getlist('genre') or None
+        genre_slugs = self.initial_data.get('genre')
+        if isinstance(genre_slugs, str):
+            return [genre_slugs]
+        return genre_slugs
+
+    def get_genre_ids(self, genre_slugs):
+        genre_ids = genre_id_cache.resolve_for_write(genre_slugs)
+        if len(genre_ids) != len(set(genre_slugs)):
+            raise serializers.ValidationError(
+                {'genre': 'Таких жанров не существует'})
+        return list(genre_ids.values())
+
     def create(self, validated_data):
         category_slug = self.initial_data.get('category', None)
-        genre_slugs = self.initial_data.get('genre', None)
+        genre_slugs = self.get_genre_slugs()
 
         if genre_slugs is None or genre_slugs == []:
             raise serializers.ValidationError(
@@ -84,69 +132,299 @@ class TitleSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {'category': 'Неверный формат категории'})
 
-        category = Category.objects.get(slug=category_slug)
-        genres = list(Genre.objects.filter(slug__in=genre_slugs))
+        category_id = category_id_cache.get_for_write(category_slug)
+        genre_ids = self.get_genre_ids(genre_slugs)
 
-        if len(genres) != len(genre_slugs):
-            raise serializers.ValidationError(
-                {'genre': 'Таких жанров не существует'})
-        if category is None:
+        if category_id is None:
             raise serializers.ValidationError(
                 {'category': 'Такой категории не существует'})
 
-        title = Title.objects.create(**validated_data)
-
-        if category_slug:
-            title.category = category
-            title.save(update_fields=['category'])
-
-        if genre_slugs:
-            title.genre.set(genres)
-
+        title = Title.objects.create(**validated_data,
+                                     category_id=category_id)
+        title.genre.set(genre_ids)
         return title
 
     def update(self, instance, validated_data):
-        Title.objects.filter(pk=instance.pk).update(**validated_data)
-
         category_slug = self.initial_data.get('category')
-        genre_slugs = self.initial_data.get('genre')
+        genre_slugs = self.get_genre_slugs()
 
         if category_slug:
-            try:
-                category = Category.objects.get(slug=category_slug)
-            except Category.DoesNotExist:
+            category_id = category_id_cache.get_for_write(category_slug)
+            if category_id is None:
                 raise serializers.ValidationError(
                     f"Категория с слагом '{category_slug}' не найдена")
-            instance.category = category
-            instance.save(update_fields=['category'])
+            validated_data['category_id'] = category_id
 
         if genre_slugs:
-            genres = list(Genre.objects.filter(slug__in=genre_slugs))
-            if len(genres) != len(genre_slugs):
-                raise serializers.ValidationError(
-                    {'genre': 'Таких жанров не существует'})
-            instance.genre.set(genres)
+            genre_ids = self.get_genre_ids(genre_slugs)
+
+        Title.objects.filter(pk=instance.pk).update(
+            **validated_data, version=models.F('version') + 1,
+            modified=timezone.now())
+        bump_collection_versions(TITLES, CATALOGUE)
+
+        if genre_slugs:
+            instance.genre.set(genre_ids)
+        if category_slug:
+            refresh_title_ranks(Title.objects.filter(pk=instance.pk))
+            recount_category_titles(Category.objects.filter(
+                pk__in=[instance.category_id, category_id]))
 
         instance.refresh_from_db()
         return instance
 
+    def get_expand(self):
+        if not hasattr(self, '_expand'):
+            request = self.get_read_request()
+            self._expand = {}
+            if request is not None:
+                self._expand = parse_expand(request, ('reviews', ))
+            if 'reviews' in self._expand:
+                self._expand['reviews'] = self.get_reviews_expand(
+                    **self._expand['reviews'])
+        return self._expand
+
+    def get_reviews_expand(self, limit=None, order='-pub_date', **unknown):
+        if unknown:
+            raise serializers.ValidationError({
+                EXPAND_PARAM: 'Неизвестные параметры: '
+                              f'{", ".join(sorted(unknown))}'})
+        limit = REVIEWS_EXPAND_LIMIT if limit is None else limit
+        if not (str(limit).isdigit()
+                and 1 <= int(limit) <= REVIEWS_EXPAND_MAX_LIMIT):
+            raise serializers.ValidationError({
+                EXPAND_PARAM: 'limit должен быть от 1 до '
+                              f'{REVIEWS_EXPAND_MAX_LIMIT}'})
+        if order not in REVIEWS_EXPAND_ORDERS:
+            raise serializers.ValidationError({
+                EXPAND_PARAM: 'order может быть одним из: '
+                              f'{", ".join(REVIEWS_EXPAND_ORDERS)}'})
+        return int(limit), order
+
+    def get_expanded_reviews(self, instances):
+        limit, order = self.get_expand()['reviews']
+        reviews = {instance.pk: [] for instance in instances}
+        for review in get_top_reviews(list(reviews), limit, order):
+            reviews[review.title_id].append(review)
+        return {title_id: ReviewSerializer(title_reviews, many=True).data
+                for title_id, title_reviews in reviews.items()}
+
     def to_representation(self, instance):
-        data = super().to_representation(instance)
+        return self.to_representation_many([instance])[0]
+
+    def to_representation_many(self, instances):
+        # Кэшируются только полные карточки: усечённый ответ собирается
+        # из суженного запроса без кэша.
+        sparse_fields = self.get_sparse_fields()
+        if sparse_fields is None:
+            cards = title_cards.get_cards(instances,
+                                          super().to_representation)
+        else:
+            cards = [super(TitleSerializer, self).to_representation(instance)
+                     for instance in instances]
+        reviews = None
+        if 'reviews' in self.get_expand():
+            reviews = self.get_expanded_reviews(instances)
+        data = []
+        for instance, card in zip(instances, cards):
+            card = dict(card)
+            if hasattr(instance, 'search_snippet') and (
+                    sparse_fields is None or 'snippet' in sparse_fields):
+                card['snippet'] = instance.search_snippet
+            if reviews is not None:
+                card['reviews'] = reviews[instance.pk]
+            data.append(card)
+        return data
 
-        data['category'] = CategorySerializer(instance.category).data
-        data['genre'] = GenreSerializer(instance.genre.all(), many=True).data
-        data['rating'] = calculate_title_rating(
-            ReviewSerializer(instance.reviews.all(), many=True).data)
 
-        return data
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(),
+                                      read_only=True)
+
+    class Meta:
+        model = TitleStats
+        fields = ('count', 'mean', 'median', 'histogram')
+
+
+TITLE_BATCH_MAX_SIZE = 500
+
+
+class TitleBatchItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=256, required=False)
+    year = serializers.IntegerField(required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
+    category = serializers.SlugField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField(),
+                                  required=False, allow_empty=False)
+
+    def validate_year(self, value):
+        if value < 0 or value > datetime.date.today().year:
+            raise serializers.ValidationError('Неверный формат года')
+        return value
+
+    def validate(self, attrs):
+        if 'id' in attrs:
+            return attrs
+        errors = {}
+        if 'name' not in attrs:
+            errors['name'] = 'Обязательное поле.'
+        if 'year' not in attrs:
+            errors['year'] = 'Неверный формат года'
+        if 'genre' not in attrs:
+            errors['genre'] = 'Неверный формат жанра'
+        if 'category' not in attrs:
+            errors['category'] = 'Неверный формат категории'
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class TitleBatch:
+    fields = ('name', 'year', 'description')
+
+    def __init__(self, data):
+        self.data = data
+        self.errors = []
+        self.new = []
+        self.changed = []
+        self.categories = self.genres = self.titles = {}
+        # Категории и жанры, у которых меняется число произведений.
+        self.category_ids = set()
+        self.genre_ids = set()
 
+    def is_valid(self):
+        if not isinstance(self.data, list) or not self.data:
+            raise serializers.ValidationError(
+                'Ожидается непустой список произведений')
+        if len(self.data) > TITLE_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Не больше {TITLE_BATCH_MAX_SIZE} произведений за запрос')
+        items = []
+        for index, item in enumerate(self.data):
+            serializer = TitleBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+            else:
+                self.add_error(index, serializer.errors)
+        self.resolve(items)
+        return not self.errors
+
+    def add_error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
+
+    def resolve(self, items):
+        self.categories = category_id_cache.resolve(
+            {item['category'] for _, item in items if 'category' in item})
+        self.genres = genre_id_cache.resolve(
+            {slug for _, item in items for slug in item.get('genre', ())})
+        # Сами строки перечитываются под блокировкой в save().
+        self.titles = set(Title.objects.filter(pk__in={
+            item['id'] for _, item in items if 'id' in item
+        }).values_list('pk', flat=True))
+        seen = set()
+        for index, item in items:
+            errors = self.get_errors(item, seen)
+            if errors:
+                self.add_error(index, errors)
+                continue
+            seen.add(item.get('id'))
+            genres = None
+            if 'genre' in item:
+                genres = list(dict.fromkeys(
+                    self.genres[slug] for slug in item['genre']))
+                self.genre_ids.update(genres)
+            if 'id' in item:
+                self.changed.append((item, genres))
+            else:
+                self.new.append((self.apply(Title(), item), genres))
+
+    def get_errors(self, item, seen):
+        errors = {}
+        if 'category' in item and item['category'] not in self.categories:
+            errors['category'] = 'Такой категории не существует'
+        if any(slug not in self.genres for slug in item.get('genre', ())):
+            errors['genre'] = 'Таких жанров не существует'
+        if 'id' in item and item['id'] not in self.titles:
+            errors['id'] = 'Произведение не найдено'
+        elif 'id' in item and item['id'] in seen:
+            errors['id'] = 'Произведение повторяется в запросе'
+        return errors
+
+    def apply(self, title, item):
+        for field in self.fields:
+            if field in item:
+                setattr(title, field, item[field])
+        if 'category' in item:
+            # Старую категорию запоминаем до того, как её перезапишем.
+            self.category_ids.add(title.category_id)
+            title.category_id = self.categories[item['category']]
+            self.category_ids.add(title.category_id)
+        return title
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def update_changed(self):
+        titles = Title.objects.select_for_update().in_bulk(
+            [item['id'] for item, _ in self.changed])
+        # Каждое произведение меняет только присланные поля: строки
+        # с одинаковым набором полей обновляются одним запросом.
+        groups = defaultdict(list)
+        for item, _ in self.changed:
+            title = self.apply(titles[item['id']], item)
+            title.version = models.F('version') + 1
+            title.modified = timezone.now()
+            fields = tuple(field for field in self.fields + ('category', )
+                           if field in item)
+            groups[fields + ('version', 'modified')].append(title)
+        for fields, group in groups.items():
+            Title.objects.bulk_update(group, fields)
+
+    @transaction.atomic
+    def save(self):
+        through = Title.genre.through
+        changed_ids = [item['id'] for item, _ in self.changed]
+        # После отката из-за блокировки новые произведения вставляются
+        # заново, без id от прошлой попытки.
+        for title, _ in self.new:
+            title.pk = None
+        Title.objects.bulk_create([title for title, _ in self.new])
+        TitleStats.objects.bulk_create(
+            [TitleStats(title=title) for title, _ in self.new])
+        if self.changed:
+            self.update_changed()
+            links = through.objects.filter(title_id__in=[
+                item['id'] for item, genres in self.changed if genres
+            ])
+            self.genre_ids.update(links.values_list('genre_id', flat=True))
+            links.delete()
+            refresh_title_ranks(Title.objects.filter(pk__in=changed_ids))
+        through.objects.bulk_create([
+            through(title_id=title_id, genre_id=genre_id)
+            for title_id, genres in (
+                [(title.pk, genres) for title, genres in self.new]
+                + [(item['id'], genres) for item, genres in self.changed])
+            for genre_id in genres or ()
+        ])
+        bump_collection_versions(TITLES, CATALOGUE)
+        recount_category_titles(
+            Category.objects.filter(pk__in=self.category_ids))
+        recount_genre_titles(Genre.objects.filter(pk__in=self.genre_ids))
+        titles = Title.objects.select_related('category').in_bulk(
+            [title.pk for title, _ in self.new] + changed_ids)
+        return ([titles[title.pk] for title, _ in self.new],
+                [titles[title_id] for title_id in changed_ids])
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.StringRelatedField()
+    snippet = serializers.CharField(source='search_snippet', read_only=True)
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'score', 'pub_date', 'author')
+        fields = ('id', 'text', 'score', 'pub_date', 'author', 'snippet')
         read_only_fields = ('id', 'author')
 
     def validate(self, attrs):
@@ -172,12 +450,14 @@ class ReviewSerializer(serializers.ModelSerializer):
         return review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.StringRelatedField()
+    snippet = serializers.CharField(source='search_snippet', read_only=True)
 
     class Meta:
         model = Comment
-        fields = ('id', 'text', 'author', 'pub_date')
+        fields = ('id', 'text', 'author', 'pub_date', 'snippet')
         read_only_fields = ('id', 'author')
 
     def validate(self, attrs):
@@ -192,3 +472,18 @@ class CommentSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         review = Comment.objects.create(**validated_data)
         return review
+
+
+class ReviewSearchSerializer(ReviewSerializer):
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title', )
+        read_only_fields = fields
+
+
+class CommentSearchSerializer(CommentSerializer):
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review', 'title')
+        read_only_fields = fields
@@ -0,0 +1,179 @@
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from .models import (
+    CATALOGUE,
+    CATEGORIES,
+    GENRES,
+    TITLES,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleStats,
+    Tombstone,
+    User,
+)
+from .utils import (
+    bump_collection_versions,
+    bump_title_versions,
+    rebuild_title_stats,
+    recalculate_title_ratings,
+    recount_category_titles,
+    recount_genre_titles,
+    refresh_title_ranks,
+    update_title_rating,
+    update_title_stats,
+)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(instance.title_id, added=instance.score)
+    elif loaded_score is None:
+        titles = Title.objects.filter(pk=instance.title_id)
+        recalculate_title_ratings(titles)
+        rebuild_title_stats(titles)
+    elif instance.score != loaded_score:
+        update_title_rating(instance.title_id, instance.score - loaded_score)
+        update_title_stats(instance.title_id, added=instance.score,
+                           removed=loaded_score)
+    instance._loaded_score = instance.score
+
+
+def is_title_delete(origin):
+    """Удаление началось с произведения, и его отзывы удаляются каскадом."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Title
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, origin=None, **kwargs):
+    if is_title_delete(origin):
+        # Рейтинг и сводка удаляются вместе с произведением.
+        return
+    update_title_rating(instance.title_id, -instance.score, -1)
+    update_title_stats(instance.title_id, removed=instance.score)
+
+
+@receiver(post_save, sender=Title)
+def bump_version_on_title_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        TitleStats.objects.create(title=instance)
+        bump_collection_versions(TITLES, CATALOGUE)
+    else:
+        titles = Title.objects.filter(pk=instance.pk)
+        bump_title_versions(titles)
+        refresh_title_ranks(titles)
+    loaded_category_id = getattr(instance, '_loaded_category_id', None)
+    if created or loaded_category_id != instance.category_id:
+        recount_category_titles(Category.objects.filter(
+            pk__in=[loaded_category_id, instance.category_id]))
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender=Title)
+def remember_genres_on_title_delete(sender, instance, **kwargs):
+    # Связи с жанрами удаляются каскадом без сигнала m2m_changed.
+    instance._genre_ids = list(instance.genre.values_list('pk', flat=True))
+    # Отзывы и комментарии тоже: их надгробия пишутся одним запросом.
+    instance._review_ids = list(instance.reviews.values_list('pk', flat=True))
+    instance._comment_ids = list(Comment.objects.filter(
+        review__title=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Title)
+def bump_version_on_title_delete(sender, instance, **kwargs):
+    bump_collection_versions(TITLES, CATALOGUE)
+    recount_category_titles(
+        Category.objects.filter(pk=instance.category_id))
+    recount_genre_titles(
+        Genre.objects.filter(pk__in=getattr(instance, '_genre_ids', [])))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_version_on_genre_change(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        bump_title_versions(Title.objects.filter(pk=instance.pk))
+    elif reverse and action in ('post_add', 'post_remove'):
+        bump_title_versions(Title.objects.filter(pk__in=pk_set))
+    elif reverse and action == 'pre_clear':
+        bump_title_versions(Title.objects.filter(genre=instance))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def recount_titles_on_genre_change(sender, instance, action, reverse, pk_set,
+                                   **kwargs):
+    if reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        recount_genre_titles(Genre.objects.filter(pk=instance.pk))
+    elif not reverse and action == 'pre_clear':
+        instance._cleared_genre_ids = list(
+            instance.genre.values_list('pk', flat=True))
+    elif not reverse and action == 'post_clear':
+        recount_genre_titles(
+            Genre.objects.filter(pk__in=instance._cleared_genre_ids))
+    elif not reverse and action in ('post_add', 'post_remove'):
+        recount_genre_titles(Genre.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def bump_version_on_category_change(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    bump_collection_versions(CATEGORIES, CATALOGUE)
+    if not kwargs.get('created'):
+        bump_title_versions(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def bump_version_on_genre_save(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    bump_collection_versions(GENRES, CATALOGUE)
+    if not kwargs.get('created'):
+        bump_title_versions(Title.objects.filter(genre=instance))
+
+
+TOMBSTONE_RESOURCES = {
+    Title: 'titles',
+    Review: 'reviews',
+    Comment: 'comments',
+    User: 'users',
+}
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=User)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    if sender in (Review, Comment) and is_title_delete(origin):
+        return
+    Tombstone.objects.create(resource=TOMBSTONE_RESOURCES[sender],
+                             object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def record_cascaded_tombstones(sender, instance, **kwargs):
+    Tombstone.objects.bulk_create(
+        [Tombstone(resource=TOMBSTONE_RESOURCES[Review], object_id=pk)
+         for pk in getattr(instance, '_review_ids', [])]
+        + [Tombstone(resource=TOMBSTONE_RESOURCES[Comment], object_id=pk)
+           for pk in getattr(instance, '_comment_ids', [])])
@@ -1,8 +1,260 @@
-from functools import reduce
+import time
+from contextlib import nullcontext
 
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import (
+    Avg,
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, RowNumber
+from django.utils import timezone
 
-def calculate_title_rating(reviews):
-    if reviews == []:
-        return 0.0
-    rating = reduce(lambda acc, review: acc + review['score'], reviews, 0)
-    return rating / len(reviews)
+from .cache import SLUG_CACHES
+from .models import (
+    CATALOGUE,
+    SCORES,
+    TITLES,
+    Category,
+    CollectionVersion,
+    Genre,
+    RankingPrior,
+    Review,
+    Title,
+    TitleRank,
+    TitleStats,
+)
+
+
+def bump_collection_versions(*names):
+    for name in names:
+        updated = CollectionVersion.objects.filter(name=name).update(
+            version=F('version') + 1, modified=timezone.now())
+        if not updated:
+            CollectionVersion.objects.get_or_create(
+                name=name, defaults={'version': 1})
+        if name in SLUG_CACHES:
+            SLUG_CACHES[name].invalidate()
+
+
+def get_collection_version(name):
+    return CollectionVersion.objects.filter(name=name).first()
+
+
+def retry_on_locked(func, *args, atomic=True, **kwargs):
+    """Выполняет func в транзакции и повторяет её, если SQLite не
+    дождался блокировки на запись («database is locked»). С atomic=False
+    func должна сама записывать данные одной транзакцией."""
+    if connection.in_atomic_block:
+        # Внешнюю транзакцию откатить и повторить отсюда нельзя.
+        return func(*args, **kwargs)
+    for attempt in range(settings.SQLITE_LOCK_RETRIES + 1):
+        try:
+            with transaction.atomic() if atomic else nullcontext():
+                return func(*args, **kwargs)
+        except OperationalError as error:
+            if ('locked' not in str(error)
+                    or attempt == settings.SQLITE_LOCK_RETRIES):
+                raise
+        time.sleep(settings.SQLITE_LOCK_RETRY_DELAY * 2 ** attempt)
+
+
+def update_title_rating(title_id, score_delta, count_delta=0):
+    rating_sum = F('rating_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        review_count=review_count,
+        rating=Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+        version=F('version') + 1,
+        modified=timezone.now(),
+    )
+    bump_collection_versions(TITLES)
+    refresh_title_ranks(Title.objects.filter(pk=title_id))
+
+
+def bump_title_versions(titles):
+    updated = titles.update(version=F('version') + 1, modified=timezone.now())
+    if updated:
+        bump_collection_versions(TITLES, CATALOGUE)
+    return updated
+
+
+def update_title_stats(title_id, added=None, removed=None):
+    if added == removed:
+        return
+    changes = {
+        f'score_{score}': F(f'score_{score}') + delta
+        for score, delta in ((added, 1), (removed, -1)) if score in SCORES
+    }
+    if not changes:
+        return
+    updated = TitleStats.objects.filter(title_id=title_id).update(**changes)
+    if not updated and added is not None:
+        # Строки ещё нет: первый отзыв произведения. При удалении отзыва
+        # сводку не создаём — произведение может удаляться каскадом.
+        rebuild_title_stats(Title.objects.filter(pk=title_id))
+
+
+def rebuild_title_stats(titles=None):
+    if titles is None:
+        titles = Title.objects.all()
+    stats = {title_id: TitleStats(title_id=title_id)
+             for title_id in titles.values_list('pk', flat=True)}
+    counts = Review.objects.filter(
+        title_id__in=titles.values('pk'), score__in=SCORES,
+    ).order_by().values_list('title_id', 'score').annotate(
+        number=Count('pk'))
+    for title_id, score, number in counts:
+        setattr(stats[title_id], f'score_{score}', number)
+    TitleStats.objects.bulk_create(
+        stats.values(),
+        update_conflicts=True,
+        unique_fields=['title'],
+        update_fields=[f'score_{score}' for score in SCORES],
+    )
+    return len(stats)
+
+
+def get_top_reviews(title_ids, limit, order):
+    """Первые `limit` отзывов каждого произведения одним запросом:
+    ROW_NUMBER() OVER (PARTITION BY title_id ORDER BY ...) <= limit."""
+    field = F(order.lstrip('-'))
+    return Review.objects.filter(title_id__in=title_ids).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=F('title_id'),
+            order_by=[field.desc() if order.startswith('-') else field.asc(),
+                      F('pk').desc()],
+        ),
+    ).filter(position__lte=limit).select_related('author').order_by(
+        'title_id', 'position')
+
+
+def recalculate_title_ratings(titles=None):
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title_id=OuterRef('pk')).order_by().values('title_id')
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()), 0),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'),
+                     output_field=IntegerField()), 0),
+        rating=Subquery(reviews.annotate(total=Avg('score')).values('total'),
+                        output_field=FloatField()),
+        version=F('version') + 1,
+        modified=timezone.now(),
+    )
+    if updated:
+        bump_collection_versions(TITLES)
+        refresh_title_ranks(titles)
+    return updated
+
+
+def recount_category_titles(categories=None):
+    if categories is None:
+        categories = Category.objects.all()
+    titles = Title.objects.filter(
+        category_id=OuterRef('pk')).order_by().values('category_id')
+    return categories.update(title_count=Coalesce(
+        Subquery(titles.annotate(total=Count('pk')).values('total'),
+                 output_field=IntegerField()), 0))
+
+
+def recount_genre_titles(genres=None):
+    if genres is None:
+        genres = Genre.objects.all()
+    links = Title.genre.through.objects.filter(
+        genre_id=OuterRef('pk')).order_by().values('genre_id')
+    return genres.update(title_count=Coalesce(
+        Subquery(links.annotate(total=Count('pk')).values('total'),
+                 output_field=IntegerField()), 0))
+
+
+def get_ranking_prior():
+    prior = RankingPrior.objects.first()
+    # Оценки от 1 до 10, поэтому C = 0 значит, что его считали по базе
+    # без отзывов: пересчитываем, как только отзывы появились.
+    if prior is None or not prior.mean:
+        return update_ranking_prior()
+    return prior
+
+
+def update_ranking_prior():
+    totals = Title.objects.aggregate(rating_sum=Sum('rating_sum'),
+                                     review_count=Sum('review_count'))
+    if not totals['review_count']:
+        # Без отзывов C не определено и не сохраняется.
+        RankingPrior.objects.all().delete()
+        return RankingPrior(mean=0,
+                            min_reviews=settings.TITLE_RANK_MIN_REVIEWS)
+    prior = RankingPrior.objects.first() or RankingPrior()
+    prior.mean = totals['rating_sum'] / totals['review_count']
+    prior.min_reviews = settings.TITLE_RANK_MIN_REVIEWS
+    prior.save()
+    return prior
+
+
+def refresh_title_ranks(titles):
+    """Пересчитывает места указанных произведений с сохранённым C:
+    запрос к произведениям и одна вставка с обновлением."""
+    prior = get_ranking_prior()
+    weight, prior_sum = prior.min_reviews, prior.min_reviews * prior.mean
+    ranks, has_empty = [], False
+    for title_id, category_id, rating_sum, review_count in titles.values_list(
+            'pk', 'category_id', 'rating_sum', 'review_count').iterator():
+        if not review_count:
+            has_empty = True
+            continue
+        ranks.append(TitleRank(
+            title_id=title_id,
+            category_id=category_id,
+            weighted_rating=(rating_sum + prior_sum) / (review_count + weight),
+        ))
+    if has_empty:
+        TitleRank.objects.filter(
+            title__in=titles.filter(review_count=0)).delete()
+    TitleRank.objects.bulk_create(
+        ranks,
+        update_conflicts=True,
+        unique_fields=['title'],
+        update_fields=['category', 'weighted_rating'],
+    )
+    return len(ranks)
+
+
+def rebuild_title_ranks():
+    """Полный пересчёт: обновляет C по всем отзывам и места всех
+    произведений."""
+    update_ranking_prior()
+    TitleRank.objects.all().delete()
+    return refresh_title_ranks(Title.objects.all())
+
+
+def find_inconsistent_title_ratings(titles=None):
+    if titles is None:
+        titles = Title.objects.all()
+    titles = titles.annotate(expected_rating=Avg('reviews__score'),
+                             expected_count=Count('reviews'),
+                             expected_sum=Sum('reviews__score'))
+    for title in titles.order_by('pk').iterator():
+        if (title.review_count != title.expected_count
+                or title.rating_sum != (title.expected_sum or 0)
+                or not _same_rating(title.rating, title.expected_rating)):
+            yield title
+
+
+def _same_rating(stored, expected):
+    if stored is None or expected is None:
+        return stored is expected
+    return abs(stored - expected) < 1e-9
@@ -1,6 +1,9 @@
 import datetime
 
-from rest_framework import viewsets, filters
+from rest_framework import generics, viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.exceptions import (
     PermissionDenied,
     ValidationError,
@@ -8,12 +11,21 @@ from rest_framework.exceptions import (
 )
 
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from .models import (
+    CATEGORIES,
+    GENRES,
+    TITLES,
     Category,
     Genre,
     Title,
+    TitleRank,
+    TitleStats,
     Review,
     Comment,
 )
@@ -21,19 +33,51 @@ from .serializers import (
     CategorySerializer,
     GenreSerializer,
     TitleSerializer,
+    TitleStatsSerializer,
     ReviewSerializer,
     CommentSerializer,
+    ReviewSearchSerializer,
+    CommentSearchSerializer,
+    TitleBatch,
 )
-from .filters import TitleFilter
+from .cache import category_id_cache, genre_id_cache, title_cards
+from .exporters import EXPORTS, export, parse_since
+from .facets import get_title_facets, parse_facets
+from .mixins import (
+    ConditionalGetMixin,
+    LockRetryMixin,
+    NestedParentMixin,
+)
+from .filters import (
+    FullTextSearchFilter,
+    TitleFilter,
+    TitleOrderingFilter,
+)
+from .search import (
+    COMMENT_SEARCH_INDEX,
+    REVIEW_SEARCH_INDEX,
+    TITLE_SEARCH_INDEX,
+)
+from .utils import retry_on_locked
 
+from api.fieldsets import SparseFieldsViewMixin
+from api.renderers import CSVRenderer, NDJSONRenderer
 from api.permissions import (
+    IsAdminRole,
     ReadOnlyOrAdmin,
     ReadOnlyOrAuthenticated,
 )
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+
+
+class CategoryViewSet(LockRetryMixin, ConditionalGetMixin,
+                      viewsets.ModelViewSet):
     queryset = Category.objects.all()
+    collection_name = CATEGORIES
+    cache_control = {'max_age': 60}
     serializer_class = CategorySerializer
     permission_classes = [ReadOnlyOrAdmin]
     lookup_field = 'slug'
@@ -43,8 +87,11 @@ class CategoryViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'delete']
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(LockRetryMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
     queryset = Genre.objects.all()
+    collection_name = GENRES
+    cache_control = {'max_age': 60}
     serializer_class = GenreSerializer
     permission_classes = [ReadOnlyOrAdmin]
     lookup_field = 'slug'
@@ -54,99 +101,239 @@ class GenreViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'delete']
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(LockRetryMixin, ConditionalGetMixin,
+                   SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category')
+    collection_name = TITLES
+    object_version_field = 'version'
     serializer_class = TitleSerializer
     permission_classes = [ReadOnlyOrAdmin]
     lookup_field = 'id'
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        TitleOrderingFilter,
+        FullTextSearchFilter,
     ]
     filterset_class = TitleFilter
+    search_index = TITLE_SEARCH_INDEX
+    ordering_fields = ['rating', 'year', 'name']
+    ordering = ['id']
+    cursor_ordering = ['id']
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def list(self, request, *args, **kwargs):
+        facets = parse_facets(request)
+        response = super().list(request, *args, **kwargs)
+        if facets and response.status_code == status.HTTP_200_OK:
+            response.data['facets'] = get_title_facets(
+                request, facets,
+                lambda: self.filter_queryset(self.get_queryset()))
+        return response
+
+    def is_conditional(self):
+        # Вложенные отзывы меняются без смены версии произведения.
+        return not self.get_serializer().get_expand()
+
+    @action(detail=False,
+            methods=['get'],
+            url_path='cache-stats',
+            permission_classes=[IsAdminRole])
+    def cache_stats(self, request):
+        return Response(title_cards.get_stats())
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        limit = request.query_params.get('limit', str(TOP_TITLES_LIMIT))
+        if not (limit.isdigit()
+                and 1 <= int(limit) <= TOP_TITLES_MAX_LIMIT):
+            raise ValidationError(
+                {'limit': f'Допустимо от 1 до {TOP_TITLES_MAX_LIMIT}'})
+        # Места посчитаны заранее: запрос идёт по индексу рейтинга
+        # и читает не больше limit строк.
+        ranks = TitleRank.objects.select_related('title__category').order_by(
+            '-weighted_rating', 'title_id')
+        category = request.query_params.get('category')
+        if category:
+            category_id = category_id_cache.get(category)
+            ranks = (ranks.filter(category_id=category_id)
+                     if category_id is not None else ranks.none())
+        genre = request.query_params.get('genre')
+        if genre:
+            genre_id = genre_id_cache.get(genre)
+            ranks = ranks.filter(Exists(Title.genre.through.objects.filter(
+                title_id=OuterRef('title_id'), genre_id=genre_id,
+            ))) if genre_id is not None else ranks.none()
+        ranks = list(ranks[:int(limit)])
+        cards = self.get_serializer(
+            [rank.title for rank in ranks], many=True).data
+        return Response([
+            {**card, 'rank': position, 'weighted_rating': rank.weighted_rating}
+            for position, (rank, card) in enumerate(zip(ranks, cards), 1)
+        ])
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, id=None):
+        # Сводка читается одной строкой, отзывы не перебираются.
+        try:
+            stats = generics.get_object_or_404(TitleStats, title_id=id)
+        except Http404:
+            stats = TitleStats(title=generics.get_object_or_404(Title, pk=id))
+        return Response(TitleStatsSerializer(stats).data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        batch = TitleBatch(request.data)
+        atomic = request.query_params.get('atomic') in ('1', 'true')
+        if (not batch.is_valid()
+                and (atomic or not batch.new + batch.changed)):
+            return Response({'errors': batch.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        created, updated = retry_on_locked(batch.save)
+        serializer = self.get_serializer
+        return Response({
+            'created': serializer(created, many=True).data,
+            'updated': serializer(updated, many=True).data,
+            'errors': batch.errors,
+        }, status=(status.HTTP_207_MULTI_STATUS if batch.errors
+                   else status.HTTP_201_CREATED))
+
+
+class ReviewViewSet(LockRetryMixin, SparseFieldsViewMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [ReadOnlyOrAuthenticated]
     lookup_field = 'id'
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ['text', 'score']
-    search_fields = ['text', 'score']
+    search_index = REVIEW_SEARCH_INDEX
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cursor_ordering = ['-pub_date', '-id']
+    # Каждая запись уже идёт одной транзакцией, а внешний ключ на
+    # произведение проверяется при её фиксации в perform_create.
+    lock_retry_atomic = False
 
     def get_queryset(self):
-        return Review.objects.filter(title_id=self.kwargs['title_id'])
+        return Review.objects.filter(
+            title_id=self.kwargs['title_id'],
+        ).select_related('author').order_by('-pub_date', '-id')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        if Review.objects.filter(author=self.request.user, title=title):
+        # Повторный отзыв и несуществующее произведение отсекает сама БД:
+        # уникальное ограничение (author, title) и внешний ключ.
+        try:
+            with transaction.atomic():
+                serializer.save(title_id=self.kwargs['title_id'],
+                                author=self.request.user,
+                                pub_date=datetime.datetime.now())
+        except IntegrityError:
+            get_object_or_404(Title, pk=self.kwargs['title_id'])
             raise ValidationError({'text': 'Нельзя создать второй отзыв'})
 
-        serializer.save(title=title,
-                        author=self.request.user,
-                        pub_date=datetime.datetime.now())
-
     def perform_update(self, serializer):
-        instance = self.get_object()
-        if (self.request.user != instance.author
+        if (self.request.user.pk != serializer.instance.author_id
                 and self.request.user.role not in ['admin', 'moderator']):
             raise PermissionDenied('Вы не можете редактировать чужой отзыв')
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
 
     def perform_destroy(self, instance):
-        if (self.request.user != instance.author
+        if (self.request.user.pk != instance.author_id
                 and self.request.user.role not in ['admin', 'moderator']):
             raise PermissionDenied('Вы не можете удалить чужой комментарий')
-        instance.delete()
+        deleted, _ = instance.delete()
+        if not deleted:
+            raise NotFound('Отзыв уже удалён')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(LockRetryMixin, NestedParentMixin,
+                     SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [ReadOnlyOrAuthenticated]
     lookup_field = 'id'
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ['text']
-    search_fields = ['text']
+    search_index = COMMENT_SEARCH_INDEX
     http_method_names = ['get', 'post', 'patch', 'delete']
+    cursor_ordering = ['-pub_date', '-id']
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    parent_not_found = 'Неверно указанный отзыв'
+    # Комментарий пишется одним запросом.
+    lock_retry_atomic = False
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs['review_id'])
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-
-        if review.title_id != title.id:
-            raise NotFound('Неверно указанный отзыв')
-
-        return Comment.objects.filter(review_id=self.kwargs['review_id'])
+        return Comment.objects.filter(
+            review_id=self.get_parent().pk,
+        ).select_related('author').order_by('-pub_date', '-id')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs['review_id'])
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-
-        if review.title_id != title.id:
-            raise NotFound('Неверно указанный отзыв')
-
-        serializer.save(review=review,
+        serializer.save(review=self.get_parent(),
                         author=self.request.user,
                         pub_date=datetime.datetime.now())
 
     def perform_update(self, serializer):
-        instance = self.get_object()
-        if (self.request.user != instance.author
+        if (self.request.user.pk != serializer.instance.author_id
                 and self.request.user.role not in ['admin', 'moderator']):
             raise PermissionDenied(
                 'Вы не можете редактировать чужой комментарий')
         serializer.save()
 
     def perform_destroy(self, instance):
-        if (self.request.user != instance.author
+        if (self.request.user.pk != instance.author_id
                 and self.request.user.role not in ['admin', 'moderator']):
             raise PermissionDenied('Вы не можете удалить чужой комментарий')
         instance.delete()
+
+
+class ReviewSearchView(generics.ListAPIView):
+    serializer_class = ReviewSearchSerializer
+    permission_classes = [ReadOnlyOrAuthenticated]
+    search_index = REVIEW_SEARCH_INDEX
+
+    def get_queryset(self):
+        return self.search_index.ranked_search(
+            Review.objects.select_related('author'),
+            self.request.query_params.get('q', ''),
+        )
+
+
+class CommentSearchView(ReviewSearchView):
+    serializer_class = CommentSearchSerializer
+    search_index = COMMENT_SEARCH_INDEX
+
+    def get_queryset(self):
+        return self.search_index.ranked_search(
+            Comment.objects.select_related('author', 'review'),
+            self.request.query_params.get('q', ''),
+        )
+
+
+class ExportView(APIView):
+    permission_classes = [IsAdminRole]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise NotFound('Неизвестный набор данных')
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_since(since)
+            except ValueError:
+                raise ValidationError({'since': 'Неверный формат даты'})
+
+        started = timezone.now()
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            export(resource, renderer.format, since or None),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{renderer.format}"')
+        response['X-Export-Timestamp'] = started.isoformat()
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_modified(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    User.objects.update(modified=F('date_joined'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_user_email_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['modified'], name='user_modified_idx'),
+        ),
+        migrations.RunPython(fill_modified, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,13 @@ class User(AbstractUser):
                             choices=Role.choices,
                             default=Role.USER)
     bio = models.TextField(max_length=1000, blank=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),
+            models.Index(fields=['modified'], name='user_modified_idx'),
+        ]
 
     def __str__(self):
         return f'{self.username}: {self.role}'
@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title, Tombstone
+from reviews.utils import find_inconsistent_title_ratings
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{id}/'
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        return Title.objects.create(name='Терминатор', year=1984,
+                                    category=category)
+
+    def assert_rating_consistent(self, title):
+        title.refresh_from_db()
+        expected = Title.objects.filter(pk=title.pk).aggregate(
+            rating=Avg('reviews__score'))['rating']
+        assert title.rating == expected, (
+            'Проверьте, что сохранённый рейтинг произведения совпадает со '
+            'средней оценкой его отзывов.'
+        )
+
+    def test_01_rating_follows_review_writes(self, title, client,
+                                             user_client, moderator_client,
+                                             admin_client):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(url).json()['rating'] is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+        review = create_single_review(user_client, title.id, 'Отлично', 10)
+        create_single_review(moderator_client, title.id, 'Неплохо', 5)
+        self.assert_rating_consistent(title)
+        assert client.get(url).json()['rating'] == 7.5
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id, id=review.json()['id'])
+        response = user_client.patch(review_url, data={'score': 1})
+        assert response.status_code == HTTPStatus.OK
+        self.assert_rating_consistent(title)
+        assert client.get(url).json()['rating'] == 3
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        self.assert_rating_consistent(title)
+        assert title.review_count == 1
+
+    def test_02_check_title_ratings_command(self, title, user_client):
+        create_single_review(user_client, title.id, 'Отлично', 9)
+        call_command('check_title_ratings')
+
+        Title.objects.filter(pk=title.pk).update(rating_sum=0,
+                                                 review_count=0)
+        with pytest.raises(CommandError):
+            call_command('check_title_ratings')
+
+        call_command('check_title_ratings', '--fix')
+        self.assert_rating_consistent(title)
+        call_command('check_title_ratings')
+
+    def test_03_stale_review_updates(self, title, user, moderator):
+        Review.objects.create(title=title, author=moderator, score=5,
+                              text='Неплохо', pub_date='2025-01-01T00:00Z')
+        review = Review.objects.create(title=title, author=user, score=5,
+                                       text='Отлично',
+                                       pub_date='2025-01-02T00:00Z')
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        self.assert_rating_consistent(title)
+        assert title.rating_sum == 14 and title.rating == 7, (
+            'Проверьте, что правка отзыва меняет рейтинг на разницу с '
+            'оценкой из БД, а не с загруженной в объект.'
+        )
+        assert not list(find_inconsistent_title_ratings())
+
+    def test_04_repeated_review_delete(self, title, user, moderator):
+        Review.objects.create(title=title, author=moderator, score=5,
+                              text='Неплохо', pub_date='2025-01-01T00:00Z')
+        review = Review.objects.create(title=title, author=user, score=9,
+                                       text='Отлично',
+                                       pub_date='2025-01-02T00:00Z')
+        stale = Review.objects.get(pk=review.pk)
+        assert review.delete()[0] == 1
+        assert stale.delete()[0] == 0, (
+            'Проверьте, что удаление уже удалённого отзыва ничего не удаляет.'
+        )
+        self.assert_rating_consistent(title)
+        assert title.review_count == 1 and title.rating_sum == 5
+        assert not list(find_inconsistent_title_ratings())
+
+
+    def test_05_title_delete_queries(self, admin_client,
+                                     django_user_model):
+        authors = django_user_model.objects.bulk_create(
+            django_user_model(username=f'author{number}',
+                              email=f'author{number}@yamdb.fake')
+            for number in range(20))
+
+        def delete_title(review_count):
+            title = Title.objects.create(name='Чужой', year=1979)
+            reviews = Review.objects.bulk_create(
+                Review(title=title, author=author, score=7, text='Отзыв',
+                       pub_date='2025-01-01T00:00Z')
+                for author in authors[:review_count])
+            Comment.objects.bulk_create(
+                Comment(review=review, author=authors[0], text='Да',
+                        pub_date='2025-01-01T00:00Z')
+                for review in reviews)
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id))
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            return len(context.captured_queries)
+
+        assert delete_title(2) == delete_title(20), (
+            'Проверьте, что число запросов при удалении произведения не '
+            'зависит от числа его отзывов.'
+        )
+        assert Tombstone.objects.filter(resource='reviews').count() == 22
+        assert Tombstone.objects.filter(resource='comments').count() == 22
@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.utils import recalculate_title_ratings
+
+
+def create_catalogue(django_user_model, titles_count):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+        for idx in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    category = Category.objects.create(name='Фильм', slug='films')
+    titles = []
+    for idx in range(titles_count):
+        title = Title.objects.create(name=f'Произведение {idx}', year=2000,
+                                     category=category)
+        title.genre.set(genres)
+        for score, author in enumerate(authors, 1):
+            Review.objects.create(title=title, author=author, score=score,
+                                  text='Отзыв', pub_date='2025-01-01T00:00Z')
+        titles.append(title)
+    recalculate_title_ratings()
+    return titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    LIST_QUERY_BUDGET = 4
+    DETAIL_QUERY_BUDGET = 3
+
+    @pytest.mark.parametrize('titles_count', (1, 5, 20))
+    def test_01_list_queries_do_not_grow_with_page_size(
+            self, client, django_user_model, titles_count):
+        create_catalogue(django_user_model, titles_count)
+        queries = count_queries(
+            client, f'{self.TITLES_URL}?page_size={titles_count}')
+        assert queries == self.LIST_QUERY_BUDGET, (
+            f'GET-запрос к `{self.TITLES_URL}` с {titles_count} '
+            f'произведениями выполняет {queries} запросов к БД, ожидается '
+            f'{self.LIST_QUERY_BUDGET} независимо от размера страницы.'
+        )
+
+    def test_02_detail_query_budget(self, client, django_user_model):
+        title = create_catalogue(django_user_model, 1)[0]
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        queries = count_queries(client, url)
+        assert queries <= self.DETAIL_QUERY_BUDGET, (
+            f'GET-запрос к `{url}` выполняет {queries} запросов к БД, '
+            f'бюджет - {self.DETAIL_QUERY_BUDGET}.'
+        )
+        data = client.get(url).json()
+        assert data['rating'] == 2
+        assert len(data['genre']) == 3
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
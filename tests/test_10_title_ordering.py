@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+
+from reviews.filters import TitleOrderingFilter
+from reviews.models import Category, Title
+
+
+def create_title(name, year, rating, category):
+    if rating is None:
+        return Title.objects.create(name=name, year=year, category=category)
+    return Title.objects.create(name=name, year=year, category=category,
+                                rating_sum=rating, review_count=1,
+                                rating=rating)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        return {
+            'unrated': create_title('Без отзывов', 2001, None, films),
+            'top': create_title('Лучший', 1990, 10, films),
+            'tie_first': create_title('Ничья Б', 1980, 7, films),
+            'tie_second': create_title('Ничья А', 1980, 7, books),
+            'low': create_title('Худший', 2010, 1, books),
+        }
+
+    def get_ids(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == 200
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_rating_desc_puts_unrated_last(self, client, titles):
+        assert self.get_ids(client, 'ordering=-rating') == [
+            titles['top'].id, titles['tie_first'].id,
+            titles['tie_second'].id, titles['low'].id, titles['unrated'].id,
+        ], (
+            f'Проверьте, что при сортировке `{self.TITLES_URL}` по убыванию '
+            'рейтинга равные значения упорядочены по `id`, а произведения '
+            'без отзывов идут последними.'
+        )
+
+    def test_02_rating_asc_puts_unrated_first(self, client, titles):
+        assert self.get_ids(client, 'ordering=rating') == [
+            titles['unrated'].id, titles['low'].id, titles['tie_first'].id,
+            titles['tie_second'].id, titles['top'].id,
+        ], (
+            f'Проверьте, что при сортировке `{self.TITLES_URL}` по '
+            'возрастанию рейтинга произведения без отзывов идут первыми.'
+        )
+
+    def test_03_multiple_fields(self, client, titles):
+        assert self.get_ids(client, 'ordering=-rating,year,name')[1:3] == [
+            titles['tie_second'].id, titles['tie_first'].id,
+        ]
+        assert self.get_ids(client, 'ordering=-year')[0] == titles['low'].id
+
+    def test_04_unknown_field_is_ignored(self, client, titles):
+        assert self.get_ids(client, 'ordering=description') == sorted(
+            title.id for title in titles.values())
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite',
+                        reason='Проверка плана запроса для SQLite')
+    def test_05_category_top_uses_index(self, titles):
+        queryset = Title.objects.filter(
+            category_id=titles['top'].category_id).order_by(
+            TitleOrderingFilter().get_order_expression('-rating'), 'id')
+        plan = queryset[:10].explain()
+        assert 'title_category_rating_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, plan
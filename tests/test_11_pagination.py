@@ -0,0 +1,123 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import (
+    MAX_PAGE_SIZE,
+    KeysetPagination,
+    PageNumberOrCursorPagination,
+)
+from reviews.models import Category, Review, Title
+
+
+def walk_cursor_pages(client, url, key='id'):
+    ids = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме `?cursor=` ответ не содержит `count`.'
+        )
+        ids.extend(obj[key] for obj in data['results'])
+        url = data['next']
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Pagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    USERS_URL = '/api/v1/users/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        return Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000, category=category)
+            for idx in range(12)
+        )
+
+    def test_01_page_size_is_capped(self, client, titles, monkeypatch):
+        response = client.get(f'{self.TITLES_URL}?page_size=7')
+        assert len(response.json()['results']) == 7, (
+            f'Проверьте, что `{self.TITLES_URL}` поддерживает параметр '
+            '`page_size`.'
+        )
+        monkeypatch.setattr(PageNumberOrCursorPagination, 'max_page_size', 10)
+        monkeypatch.setattr(KeysetPagination, 'max_page_size', 10)
+        response = client.get(
+            f'{self.TITLES_URL}?page_size={MAX_PAGE_SIZE * 10}')
+        assert response.json()['count'] == len(titles)
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что `page_size` ограничен `max_page_size`.'
+        )
+        response = client.get(
+            f'{self.TITLES_URL}?cursor=&page_size={MAX_PAGE_SIZE * 10}')
+        assert len(response.json()['results']) == 10
+
+    def test_02_title_cursor_pages(self, client, titles):
+        ids, pages = walk_cursor_pages(
+            client, f'{self.TITLES_URL}?cursor=&page_size=5')
+        assert ids == [title.id for title in titles], (
+            f'Проверьте, что режим `?cursor=` у `{self.TITLES_URL}` '
+            'возвращает все произведения по возрастанию `id` без повторов.'
+        )
+        assert pages == 3
+
+    def test_03_cursor_page_skips_count(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'{self.TITLES_URL}?cursor=')
+        assert not any('COUNT(' in query['sql'].upper()
+                       for query in context.captured_queries), (
+            'Проверьте, что в режиме `?cursor=` не выполняется `COUNT(*)`.'
+        )
+
+    def test_04_review_cursor_pages(self, client, titles, django_user_model):
+        title = titles[0]
+        reviews = [
+            Review.objects.create(
+                title=title, score=5, text='Отзыв',
+                pub_date='2025-01-01T00:00Z',
+                author=django_user_model.objects.create_user(
+                    username=f'author{idx}', email=f'author{idx}@yamdb.fake'))
+            for idx in range(7)
+        ]
+        # Старший id с более ранней датой: порядок задаёт pub_date.
+        reviews.append(Review.objects.create(
+            title=title, score=5, text='Отзыв', pub_date='2024-01-01T00:00Z',
+            author=django_user_model.objects.create_user(
+                username='author7', email='author7@yamdb.fake')))
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        ids, _ = walk_cursor_pages(client, url + '?cursor=&page_size=3')
+        assert ids == [review.id for review in reversed(reviews[:-1])] + [
+            reviews[-1].id], (
+            'Проверьте, что режим `?cursor=` для отзывов возвращает сначала '
+            'новые отзывы без повторов.'
+        )
+        page = client.get(url + '?page_size=100').json()['results']
+        assert [review['id'] for review in page] == ids, (
+            'Проверьте, что отзывы идут в одном порядке в режимах `?page=` '
+            'и `?cursor=`.'
+        )
+
+    def test_05_user_cursor_pages(self, admin_client, django_user_model):
+        for idx in range(6):
+            django_user_model.objects.create_user(
+                username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        usernames, _ = walk_cursor_pages(
+            admin_client, f'{self.USERS_URL}?cursor=', key='username')
+        assert usernames == list(django_user_model.objects.order_by(
+            'id').values_list('username', flat=True))
+
+    def test_06_cursor_rejects_other_orderings(self, client, titles):
+        for params in ('ordering=-year', 'search=произведение'):
+            response = client.get(f'{self.TITLES_URL}?cursor=&{params}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `?cursor=` вместе с `{params}` возвращает '
+                'ответ со статусом 400.'
+            )
+            assert 'cursor' in response.json()
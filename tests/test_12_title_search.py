@@ -0,0 +1,86 @@
+import pytest
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        return {
+            'escape': Title.objects.create(
+                name='Побег из Шоушенка', year=1994, category=category,
+                description='Бухгалтер Энди Дюфрейн осуждён за убийство.'),
+            'hedgehog': Title.objects.create(
+                name='Ёжик в тумане', year=1975, category=category,
+                description='Мультфильм о путешествии к медвежонку.'),
+            'godfather': Title.objects.create(
+                name='Крёстный отец', year=1972, category=category,
+                description='Семья Корлеоне и побег от прошлого.'),
+        }
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == 200
+        return response.json()['results']
+
+    def test_01_cyrillic_prefix_and_case(self, client, titles):
+        results = self.search(client, 'ШОУШЕНК')
+        assert [title['id'] for title in results] == [titles['escape'].id], (
+            f'Проверьте, что поиск `{self.TITLES_URL}?search=` не зависит от '
+            'регистра кириллицы и находит слова по началу.'
+        )
+
+    def test_02_yo_is_folded(self, client, titles):
+        for query in ('ежик', 'Ёжик', 'крестный'):
+            assert len(self.search(client, query)) == 1, (
+                'Проверьте, что при поиске буквы `ё` и `е` не различаются.'
+            )
+
+    def test_03_ranked_with_snippets(self, client, titles):
+        results = self.search(client, 'побег')
+        assert [title['id'] for title in results] == [
+            titles['escape'].id, titles['godfather'].id,
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+        assert all('<mark>' in title['snippet'] for title in results), (
+            'Проверьте, что найденные произведения содержат фрагмент с '
+            'подсветкой совпадения в поле `snippet`.'
+        )
+        assert 'snippet' not in client.get(self.TITLES_URL).json()[
+            'results'][0]
+
+    def test_04_index_follows_title_changes(self, client, admin_client,
+                                            titles):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles['hedgehog'].id)
+        response = admin_client.patch(url, data={'name': 'Медвежонок'},
+                                      format='json')
+        assert response.status_code == 200
+        assert self.search(client, 'ежик') == []
+        assert len(self.search(client, 'медвежонок')) == 1
+
+        titles['escape'].delete()
+        assert self.search(client, 'шоушенк') == []
+
+    def test_05_empty_query_returns_all(self, client, titles):
+        assert len(self.search(client, '  ')) == len(titles)
+        assert self.search(client, '!!!') == []
+
+    def test_06_short_inflected_words(self, client):
+        tree = Title.objects.create(name='Ёлка', year=2010)
+        cat = Title.objects.create(name='Кот в сапогах', year=2011)
+        for query, title in (('ёлки', tree), ('ёлку', tree),
+                             ('коты', cat), ('котом', cat)):
+            assert [result['id'] for result in self.search(
+                client, query)] == [title.id], (
+                'Проверьте, что поиск находит короткие слова в других '
+                f'формах: `{query}`.'
+            )
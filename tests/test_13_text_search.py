@@ -0,0 +1,126 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TextSearch:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/')
+    REVIEWS_SEARCH_URL = '/api/v1/reviews/search/'
+    COMMENTS_SEARCH_URL = '/api/v1/comments/search/'
+
+    @pytest.fixture
+    def reviews(self, admin, moderator, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        first, second = (
+            Title.objects.create(name=name, year=2000, category=category)
+            for name in ('Побег из Шоушенка', 'Крёстный отец')
+        )
+        reviews = {
+            'hope': Review.objects.create(
+                title=first, author=user, score=10,
+                pub_date='2025-01-01T00:00Z',
+                text='История о надежде и дружбе в стенах тюрьмы.'),
+            'long': Review.objects.create(
+                title=first, author=moderator, score=8,
+                pub_date='2025-01-01T00:00Z',
+                text='Немного затянуто, но надежда побеждает.'),
+            'family': Review.objects.create(
+                title=second, author=admin, score=9,
+                pub_date='2025-01-01T00:00Z',
+                text='Сага о семье и надежде на будущее.'),
+        }
+        Comment.objects.create(review=reviews['hope'], author=admin,
+                               pub_date='2025-01-01T00:00Z',
+                               text='Полностью согласен про дружбу.')
+        Comment.objects.create(review=reviews['hope'], author=moderator,
+                               pub_date='2025-01-01T00:00Z',
+                               text='Фильм идеализирует персонажей.')
+        return reviews
+
+    def get_results(self, client, url, params):
+        response = client.get(url, params)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_review_search_is_scoped_by_title(self, client, reviews):
+        title_id = reviews['hope'].title_id
+        results = self.get_results(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            {'search': 'надежд'})
+        assert {review['id'] for review in results} == {
+            reviews['hope'].id, reviews['long'].id,
+        }, (
+            'Проверьте, что поиск по отзывам ограничен отзывами '
+            'произведения из адреса запроса.'
+        )
+        assert all('<mark>' in review['snippet'] for review in results)
+
+    def test_02_global_review_search(self, client, reviews):
+        results = self.get_results(client, self.REVIEWS_SEARCH_URL,
+                                   {'q': 'НАДЕЖДА дружба'})
+        assert [review['id'] for review in results] == [reviews['hope'].id]
+        assert results[0]['title'] == reviews['hope'].title_id
+        assert self.get_results(client, self.REVIEWS_SEARCH_URL, {}) == [], (
+            f'Проверьте, что `{self.REVIEWS_SEARCH_URL}` без параметра `q` '
+            'возвращает пустой список.'
+        )
+
+    def test_03_comment_search(self, client, reviews):
+        review = reviews['hope']
+        url = self.COMMENTS_URL_TEMPLATE.format(title_id=review.title_id,
+                                                review_id=review.id)
+        assert len(self.get_results(client, url, {'search': 'дружб'})) == 1
+        results = self.get_results(client, self.COMMENTS_SEARCH_URL,
+                                   {'q': 'персонаж'})
+        assert len(results) == 1
+        assert results[0]['review'] == review.id
+        assert results[0]['title'] == review.title_id
+
+    def test_04_index_follows_review_changes(self, client, user_client,
+                                             reviews):
+        review = reviews['hope']
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)
+        response = user_client.patch(f'{url}{review.id}/',
+                                     data={'text': 'Передумал: скучно.'})
+        assert response.status_code == 200
+        assert self.get_results(client, self.REVIEWS_SEARCH_URL,
+                                {'q': 'скучно'})[0]['id'] == review.id
+        assert self.get_results(client, self.REVIEWS_SEARCH_URL,
+                                {'q': 'дружба'}) == []
+
+    def test_05_triggers_survive_migrate_back(self, client, user, reviews):
+        def get_triggers():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type = 'trigger' AND name LIKE '%_fts_%'")
+                return {name for name, in cursor.fetchall()}
+
+        expected = {f'reviews_{table}_fts_{action}'
+                    for table in ('title', 'review', 'comment')
+                    for action in ('insert', 'update', 'delete')}
+        assert get_triggers() == expected
+        try:
+            call_command('migrate', 'reviews', '0018', verbosity=0)
+            assert get_triggers() == expected, (
+                'Проверьте, что откат миграций, пересоздающих таблицы, '
+                'восстанавливает триггеры полнотекстового поиска.'
+            )
+        finally:
+            call_command('migrate', verbosity=0)
+        assert get_triggers() == expected
+        review = reviews['hope']
+        review.text = 'Про отчаяние.'
+        review.save()
+        results = self.get_results(client, self.REVIEWS_SEARCH_URL,
+                                   {'q': 'отчаяние'})
+        assert [result['id'] for result in results] == [review.id]
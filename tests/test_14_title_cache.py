@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    CACHE_STATS_URL = '/api/v1/titles/cache-stats/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Терминатор', year=1984,
+                                     category=category)
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        return title
+
+    def get_detail(self, client, title):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id))
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_cached_list_skips_genre_query(self, client, title):
+        with CaptureQueriesContext(connection) as cold:
+            first = client.get(self.TITLES_URL).json()
+        with CaptureQueriesContext(connection) as warm:
+            second = client.get(self.TITLES_URL).json()
+        assert first == second
+        assert len(warm.captured_queries) < len(cold.captured_queries), (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'берёт карточки произведений из кэша.'
+        )
+
+    def test_02_title_changes_invalidate_card(self, client, admin_client,
+                                              title):
+        self.get_detail(client, title)
+        response = admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id),
+            data={'name': 'Терминатор 2'}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_detail(client, title)['name'] == 'Терминатор 2'
+
+        title.genre.add(Genre.objects.create(name='Ужасы', slug='horror'))
+        assert len(self.get_detail(client, title)['genre']) == 2
+
+        Genre.objects.get(slug='drama').delete()
+        assert self.get_detail(client, title)['genre'] == [
+            {'name': 'Ужасы', 'slug': 'horror'}]
+
+        category = title.category
+        category.name = 'Кино'
+        category.save()
+        assert self.get_detail(client, title)['category']['name'] == 'Кино'
+
+        category.delete()
+        assert self.get_detail(client, title)['category'] is None
+
+    def test_03_review_changes_invalidate_rating(self, client, user_client,
+                                                 title):
+        assert self.get_detail(client, title)['rating'] is None
+        create_single_review(user_client, title.id, 'Отлично', 8)
+        assert self.get_detail(client, title)['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш карточки произведения.'
+        )
+
+    def test_04_cache_stats(self, client, admin_client, user_client, title):
+        assert user_client.get(
+            self.CACHE_STATS_URL).status_code == HTTPStatus.FORBIDDEN
+        self.get_detail(client, title)
+        self.get_detail(client, title)
+        self.get_detail(client, title)
+        stats = admin_client.get(self.CACHE_STATS_URL).json()
+        assert stats == {'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3}, (
+            f'Проверьте, что `{self.CACHE_STATS_URL}` возвращает счётчики '
+            'попаданий и промахов кэша карточек.'
+        )
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Терминатор', year=1984,
+                                     category=category)
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        return title
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.headers['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным заголовком '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что проверка `If-None-Match` для `{url}` выполняет '
+            'один запрос к базе данных.'
+        )
+        assert response.headers['ETag'] == etag
+        return etag
+
+    def test_01_collections_not_modified(self, client, title):
+        for url in (self.CATEGORIES_URL, self.GENRES_URL, self.TITLES_URL):
+            self.assert_not_modified(client, url)
+        response = client.get(self.CATEGORIES_URL)
+        assert 'max-age=60' in response.headers['Cache-Control']
+        assert client.get(
+            self.CATEGORIES_URL,
+            HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified'],
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_02_query_string_is_part_of_etag(self, client, title):
+        etag = client.get(self.TITLES_URL).headers['ETag']
+        response = client.get(self.TITLES_URL, {'year': 1984},
+                              HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_writes_change_etag(self, client, admin_client, user_client,
+                                   title):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        detail_etag = self.assert_not_modified(client, url)
+        list_etag = self.assert_not_modified(client, self.TITLES_URL)
+        genres_etag = self.assert_not_modified(client, self.GENRES_URL)
+
+        create_single_review(user_client, title.id, 'Отлично', 8)
+        response = client.get(url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет `ETag` произведения.'
+        )
+        assert response.json()['rating'] == 8
+        assert client.get(
+            self.TITLES_URL, HTTP_IF_NONE_MATCH=list_etag,
+        ).status_code == HTTPStatus.OK
+
+        response = admin_client.post(self.GENRES_URL,
+                                     data={'name': 'Ужасы', 'slug': 'horror'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(
+            self.GENRES_URL, HTTP_IF_NONE_MATCH=genres_etag,
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что добавление жанра меняет `ETag` списка жанров.'
+        )
+
+    def test_04_missing_title(self, client, title):
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id + 1)
+        response = client.get(url, HTTP_IF_NONE_MATCH='"titles-1-0"')
+        assert response.status_code == HTTPStatus.NOT_FOUND
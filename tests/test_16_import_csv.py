@@ -0,0 +1,119 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+CSV_FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '10,reader,reader@yamdb.fake,user,,,\n'
+        '11,critic,critic@yamdb.fake,moderator,,Иван,\n'
+    ),
+    'category.csv': 'name,slug\nФильм,movie\nКнига,book\nМузыка,music\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,rating,category,description\n'
+        '1,Побег из Шоушенка,1994,0,1,\n'
+        '2,Мастер и Маргарита,1967,0,2,Роман о дьяволе в Москве\n'
+        '3,Без категории,2000,0,,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,2,2\n4,9,1\n',
+    'review.csv': (
+        'id,text,score,pub_date,author_id,title_id\n'
+        '1,"Надежда, дружба",10,2025-11-06T12:00:00,10,1\n'
+        '2,Затянуто,7,2025-11-06T12:05:00,11,1\n'
+        '3,Неизвестный автор,1,2025-11-06T12:05:00,99,1\n'
+    ),
+    'comments.csv': (
+        'id,text,pub_date,author_id,review_id\n'
+        '1,Согласен,2025-11-06T16:10:00,11,1\n'
+        '2,К удалённому отзыву,2025-11-06T16:10:00,10,3\n'
+    ),
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ImportCsv:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        for filename, content in CSV_FILES.items():
+            (tmp_path / filename).write_text(content, encoding='utf-8')
+        return tmp_path
+
+    def import_csv(self, **options):
+        out = StringIO()
+        call_command('import_csv', stdout=out, **options)
+        return out.getvalue()
+
+    def test_01_imports_in_dependency_order(self, data_dir):
+        output = self.import_csv(path=data_dir, batch_size=2)
+        assert User.objects.count() == 2
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 2
+        titles = {title.id: title for title in Title.objects.all()}
+        assert titles[1].category.slug == 'movie', (
+            'Проверьте, что `import_csv` сопоставляет номер строки '
+            '`category.csv` с созданной категорией.'
+        )
+        assert titles[2].category.slug == 'book'
+        assert titles[3].category is None
+        assert set(titles[2].genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'}
+        assert Review.objects.count() == 2
+        assert Comment.objects.count() == 1
+        assert 'review.csv: 2 строк, пропущено 1' in output, (
+            'Проверьте, что `import_csv` сообщает число загруженных и '
+            'пропущенных строк по каждой таблице.'
+        )
+        assert 'строк/с' in output
+        assert '  3: author_id=99 нет в users.csv' in output, (
+            'Проверьте, что `import_csv` называет пропущенные строки и '
+            'внешний ключ, которого не нашлось.'
+        )
+
+    def test_02_ratings_and_dates(self, data_dir):
+        self.import_csv(path=data_dir)
+        title = Title.objects.get(pk=1)
+        assert title.review_count == 2
+        assert title.rating == 8.5, (
+            'Проверьте, что после загрузки отзывов `import_csv` '
+            'пересчитывает рейтинг произведений.'
+        )
+        assert Review.objects.get(pk=1).pub_date.tzinfo is not None
+
+    def test_03_partial_import_resolves_existing_rows(self, data_dir):
+        self.import_csv(path=data_dir)
+        Comment.objects.all().delete()
+        for filename in CSV_FILES:
+            if filename != 'comments.csv':
+                (data_dir / filename).unlink()
+        self.import_csv(path=data_dir)
+        assert Comment.objects.count() == 1
+
+    def test_04_errors(self, data_dir):
+        self.import_csv(path=data_dir)
+        with pytest.raises(CommandError):
+            self.import_csv(path=data_dir)
+        with pytest.raises(CommandError):
+            self.import_csv(path=data_dir / 'missing')
+
+    def test_05_bundled_data(self):
+        def count_rows(filename):
+            with open(settings.BASE_DIR / 'static/data' / filename,
+                      encoding='utf-8', newline='') as file:
+                return sum(1 for _ in csv.DictReader(file))
+
+        self.import_csv()
+        for model, filename in ((User, 'users.csv'),
+                                (Title, 'titles.csv'),
+                                (Review, 'review.csv'),
+                                (Comment, 'comments.csv')):
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что `import_csv` загружает все строки '
+                f'`{filename}` из static/data.'
+            )
@@ -0,0 +1,116 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from reviews.importers import CsvTable
+from reviews.models import ImportCheckpoint, Review, Title
+
+REVIEWS = 25
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ResumableImport:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        (tmp_path / 'users.csv').write_text(
+            'id,username,email,role,bio,first_name,last_name\n'
+            + ''.join(f'{i},user{i},user{i}@yamdb.fake,user,,,\n'
+                      for i in range(1, REVIEWS + 1)),
+            encoding='utf-8')
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,rating,category,description\n'
+            '1,Побег из Шоушенка,1994,0,,"Многострочное\nописание"\n',
+            encoding='utf-8')
+        (tmp_path / 'review.csv').write_text(
+            'id,text,score,pub_date,author_id,title_id\n'
+            + ''.join(f'{i},"Отзыв\n№ {i}",{i % 10 + 1},'
+                      f'2025-11-06T12:00:00,{i},1\n'
+                      for i in range(1, REVIEWS + 1)),
+            encoding='utf-8')
+        return tmp_path
+
+    def import_csv(self, data_dir, **options):
+        out = StringIO()
+        call_command('import_csv', path=data_dir, batch_size=10,
+                     stdout=out, **options)
+        return out.getvalue()
+
+    def test_01_resume_after_crash(self, data_dir, monkeypatch):
+        bulk_create = CsvTable.bulk_create
+        calls = []
+
+        def crash_on_second_review_batch(table, objects, upsert=False):
+            if table.name == 'review':
+                calls.append(len(objects))
+                if len(calls) == 2:
+                    raise RuntimeError('Сбой загрузки')
+            return bulk_create(table, objects, upsert)
+
+        monkeypatch.setattr(CsvTable, 'bulk_create',
+                            crash_on_second_review_batch)
+        with pytest.raises(RuntimeError):
+            self.import_csv(data_dir)
+        assert Review.objects.count() == 10
+        checkpoint = ImportCheckpoint.objects.get(
+            source=str((data_dir / 'review.csv').resolve()))
+        assert checkpoint.batch == 1
+        assert checkpoint.rows == 10
+
+        monkeypatch.setattr(CsvTable, 'bulk_create', bulk_create)
+        output = self.import_csv(data_dir, resume=True)
+        assert Review.objects.count() == REVIEWS, (
+            'Проверьте, что `import_csv --resume` продолжает загрузку с '
+            'последней контрольной точки без повторной вставки строк.'
+        )
+        assert 'users.csv: уже загружен' in output
+        assert 'review.csv: 15 строк' in output
+        assert 'продолжено с пакета 1' in output
+        assert Review.objects.get(pk=7).text == 'Отзыв\n№ 7'
+        assert Title.objects.get(pk=1).review_count == REVIEWS
+
+    def test_02_changed_file_is_not_resumed(self, data_dir):
+        self.import_csv(data_dir)
+        ImportCheckpoint.objects.update(completed=False)
+        os.utime(data_dir / 'users.csv', (0, 0))
+        with pytest.raises(CommandError):
+            self.import_csv(data_dir, resume=True)
+
+    def test_03_workers(self, data_dir):
+        output = self.import_csv(data_dir, workers=2)
+        assert Review.objects.count() == REVIEWS, (
+            'Проверьте, что `import_csv --workers 2` загружает все строки.'
+        )
+        assert 'review.csv: 25 строк, пропущено 0, 3 пакетов' in output
+
+    def test_04_upsert(self, data_dir):
+        self.import_csv(data_dir)
+        with pytest.raises(CommandError):
+            self.import_csv(data_dir)
+        path = data_dir / 'titles.csv'
+        path.write_text(
+            path.read_text(encoding='utf-8').replace('1994', '1995'),
+            encoding='utf-8')
+        self.import_csv(data_dir, upsert=True)
+        assert Title.objects.get().year == 1995, (
+            'Проверьте, что `import_csv --upsert` обновляет существующие '
+            'записи по натуральному ключу.'
+        )
+        assert Review.objects.count() == REVIEWS
+
+    def test_05_deferred_indexes(self, data_dir, client):
+        self.import_csv(data_dir, defer_indexes=True, relaxed_pragmas=True)
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Title._meta.db_table)
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] != 0
+        assert 'title_rating_idx' in constraints, (
+            'Проверьте, что после `import_csv --defer-indexes` индексы '
+            'построены заново.'
+        )
+        response = client.get('/api/v1/reviews/search/', {'q': 'отзыв'})
+        assert response.json()['count'] == REVIEWS
@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{resource}/'
+
+    @pytest.fixture
+    def reviews(self, admin, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [Genre.objects.create(name='Драма', slug='drama'),
+                  Genre.objects.create(name='Комедия', slug='comedy')]
+        reviews = []
+        for number in range(5):
+            title = Title.objects.create(name=f'Фильм {number}', year=2000,
+                                         category=category)
+            title.genre.set(genres)
+            reviews.append(Review.objects.create(
+                title=title, author=user, score=number + 1,
+                text=f'Отзыв, "номер" {number}',
+                pub_date=f'2025-0{number + 1}-01T00:00Z'))
+        Comment.objects.create(review=reviews[0], author=admin,
+                               text='Согласен', pub_date='2025-06-01T00:00Z')
+        return reviews
+
+    def get_export(self, client, resource, **params):
+        response = client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource=resource), params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что администратор может выгрузить `{resource}`.'
+        )
+        assert response.streaming, (
+            'Проверьте, что выгрузка передаётся потоком через '
+            '`StreamingHttpResponse`.'
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_admin_only(self, client, user_client, reviews):
+        url = self.EXPORT_URL_TEMPLATE.format(resource='titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_ndjson_titles(self, admin_client, reviews):
+        with CaptureQueriesContext(connection) as context:
+            content = self.get_export(admin_client, 'titles')
+        titles = [json.loads(line) for line in content.splitlines()]
+        assert [title['id'] for title in titles] == [
+            review.title_id for review in reviews]
+        assert titles[0]['category'] == 'films'
+        assert sorted(titles[0]['genre']) == ['comedy', 'drama']
+        assert titles[2]['rating'] == 3
+        assert len(context.captured_queries) <= 4, (
+            'Проверьте, что выгрузка произведений не выполняет отдельный '
+            'запрос для каждой записи.'
+        )
+
+    def test_03_csv_reviews_since(self, admin_client, reviews):
+        Review.objects.update(modified=F('pub_date'))
+        content = self.get_export(admin_client, 'reviews', format='csv',
+                                  since='2025-03-01')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [int(row['id']) for row in rows] == [
+            review.id for review in reviews[2:]], (
+            'Проверьте, что параметр `since` ограничивает выгрузку '
+            'записями начиная с указанной даты.'
+        )
+        assert rows[0]['text'] == 'Отзыв, "номер" 2'
+        assert rows[0]['author'] == reviews[2].author.username
+
+    def test_04_titles_since_follow_changes(self, admin_client, admin,
+                                            reviews):
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource='titles'))
+        b''.join(response.streaming_content)
+        since = response.headers['X-Export-Timestamp']
+        assert self.get_export(admin_client, 'titles', since=since) == ''
+        title = reviews[3].title
+        Review.objects.create(title=title, author=admin, score=9,
+                              text='Ещё', pub_date='2025-07-01T00:00Z')
+        content = self.get_export(admin_client, 'titles', since=since)
+        assert [json.loads(line)['id'] for line in content.splitlines()] == [
+            title.id], (
+            'Проверьте, что изменение рейтинга попадает в инкрементальную '
+            'выгрузку произведений.'
+        )
+
+    def test_05_errors(self, admin_client, reviews):
+        assert admin_client.get(self.EXPORT_URL_TEMPLATE.format(
+            resource='secrets')).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource='titles'),
+            {'since': 'вчера'},
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_command(self, tmp_path, reviews):
+        path = tmp_path / 'comments.ndjson'
+        call_command('export_data', 'comments', output=str(path),
+                     stderr=io.StringIO())
+        comment, = [json.loads(line) for line in path.read_text().splitlines()]
+        assert comment['review'] == reviews[0].id
+        assert comment['title'] == reviews[0].title_id
+
+    def test_07_since_follows_edits_and_deletions(self, admin_client,
+                                                  user_client, user,
+                                                  reviews):
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource='reviews'))
+        b''.join(response.streaming_content)
+        since = response.headers['X-Export-Timestamp']
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/{reviews[0].id}/'
+        assert user_client.patch(
+            url, data={'text': 'Исправлено'}).status_code == HTTPStatus.OK
+        user.bio = 'Новое о себе'
+        user.save()
+        reviews[1].title.delete()
+
+        content = self.get_export(admin_client, 'reviews', since=since)
+        assert [json.loads(line)['text'] for line in content.splitlines()] == [
+            'Исправлено'], (
+            'Проверьте, что изменённый отзыв попадает в инкрементальную '
+            'выгрузку.'
+        )
+        content = self.get_export(admin_client, 'users', since=since)
+        assert [json.loads(line)['id'] for line in content.splitlines()] == [
+            user.id]
+        content = self.get_export(admin_client, 'deletions', since=since)
+        deleted = {(row['resource'], row['id']) for row in map(
+            json.loads, content.splitlines())}
+        assert deleted == {('titles', reviews[1].title_id),
+                           ('reviews', reviews[1].id)}, (
+            'Проверьте, что удаления, в том числе каскадные, попадают '
+            'в выгрузку `deletions`.'
+        )
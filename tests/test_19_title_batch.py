@@ -0,0 +1,169 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from reviews.serializers import TitleBatch
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleBatch:
+
+    BATCH_URL = '/api/v1/titles/batch/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.fixture(autouse=True)
+    def catalogue(self):
+        Category.objects.create(name='Фильм', slug='films')
+        Category.objects.create(name='Книга', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def make_items(self, count):
+        return [{
+            'name': f'Произведение {number}',
+            'year': 2000,
+            'category': 'films',
+            'genre': ['drama', 'comedy'],
+        } for number in range(count)]
+
+    def post(self, client, data, **params):
+        url = self.BATCH_URL
+        if params:
+            url += '?' + '&'.join(f'{k}={v}' for k, v in params.items())
+        return client.post(url, data=data, format='json')
+
+    def test_01_admin_only(self, user_client):
+        response = self.post(user_client, self.make_items(1))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_partial_success(self, admin_client):
+        items = self.make_items(3)
+        items.insert(1, {'name': 'Без года', 'category': 'films',
+                         'genre': ['drama']})
+        items.append({'name': 'Чужой жанр', 'year': 1999,
+                      'category': 'films', 'genre': ['horror']})
+        response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            f'Проверьте, что POST-запрос к `{self.BATCH_URL}` с частью '
+            'некорректных произведений возвращает ответ со статусом 207.'
+        )
+        data = response.json()
+        assert [error['index'] for error in data['errors']] == [1, 4]
+        assert 'year' in data['errors'][0]['errors']
+        assert 'genre' in data['errors'][1]['errors']
+        assert [title['name'] for title in data['created']] == [
+            'Произведение 0', 'Произведение 1', 'Произведение 2']
+        assert Title.objects.count() == 3
+        title = Title.objects.get(name='Произведение 2')
+        assert title.category.slug == 'films'
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'}
+
+    def test_03_queries_do_not_grow_with_batch(self, admin_client):
+        self.post(admin_client, self.make_items(1))
+        counts = []
+        for size in (2, 40):
+            with CaptureQueriesContext(connection) as context:
+                response = self.post(admin_client, self.make_items(size))
+            assert response.status_code == HTTPStatus.CREATED
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что POST-запрос к `{self.BATCH_URL}` выполняет '
+            'одинаковое число запросов к БД независимо от размера пакета.'
+        )
+
+    def test_04_atomic_mode(self, admin_client):
+        items = self.make_items(2) + [{'name': 'Без категории'}]
+        response = self.post(admin_client, items, atomic='true')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['errors'][0]['index'] == 2
+        assert not Title.objects.exists(), (
+            'Проверьте, что в режиме `atomic` ошибка в одном произведении '
+            'отменяет создание всего пакета.'
+        )
+        response = self.post(admin_client, [{'name': 'x'}])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert self.post(admin_client, []).status_code == (
+            HTTPStatus.BAD_REQUEST)
+
+    def test_05_update(self, client, admin_client):
+        created = self.post(admin_client, self.make_items(2)).json()['created']
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=created[0]['id'])
+        assert client.get(url).json()['name'] == 'Произведение 0'
+        response = self.post(admin_client, [
+            {'id': created[0]['id'], 'name': 'Новое имя', 'category': 'books',
+             'genre': ['comedy']},
+            {'id': created[1]['id'], 'year': 1990},
+            {'id': created[1]['id'], 'year': 1991},
+            {'id': 9999, 'year': 1990},
+        ])
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        assert [error['index'] for error in response.json()['errors']] == [
+            2, 3]
+        title = client.get(url).json()
+        assert title['name'] == 'Новое имя', (
+            'Проверьте, что пакетное обновление сбрасывает кэш карточки.'
+        )
+        assert title['category']['slug'] == 'books'
+        assert title['genre'] == [{'name': 'Комедия', 'slug': 'comedy'}]
+        second = Title.objects.get(pk=created[1]['id'])
+        assert second.year == 1990
+        assert second.genre.count() == 2
+
+    def test_06_recounts_only_touched_counters(self, admin_client):
+        created = self.post(admin_client, self.make_items(2)).json()['created']
+        Category.objects.create(name='Музыка', slug='music', title_count=5)
+        Genre.objects.create(name='Рок', slug='rock', title_count=5)
+        response = self.post(admin_client, [
+            {'id': created[0]['id'], 'category': 'books',
+             'genre': ['comedy']},
+        ])
+        assert response.status_code == HTTPStatus.CREATED
+        assert dict(Category.objects.values_list('slug', 'title_count')) == {
+            'films': 1, 'books': 1, 'music': 5}, (
+            'Проверьте, что пакетное обновление пересчитывает счётчики '
+            'только старой и новой категорий.'
+        )
+        assert dict(Genre.objects.values_list('slug', 'title_count')) == {
+            'drama': 1, 'comedy': 2, 'rock': 5}, (
+            'Проверьте, что пакетное обновление пересчитывает счётчики '
+            'только жанров, у которых удалены или добавлены связи.'
+        )
+
+    def test_07_update_keeps_concurrent_edits(self, admin_client):
+        created = self.post(admin_client, self.make_items(2)).json()['created']
+        batch = TitleBatch([{'id': created[0]['id'], 'year': 1990},
+                            {'id': created[1]['id'], 'name': 'Новое имя'}])
+        assert batch.is_valid()
+        # Правка из другого запроса между проверкой и записью пакета.
+        Title.objects.filter(pk__in=[title['id'] for title in created]).update(
+            name='Чужая правка', year=1980, description='Чужое описание')
+        with CaptureQueriesContext(connection) as context:
+            batch.save()
+        first = Title.objects.get(pk=created[0]['id'])
+        second = Title.objects.get(pk=created[1]['id'])
+        assert (first.name, first.year, first.description) == (
+            'Чужая правка', 1990, 'Чужое описание'), (
+            'Проверьте, что пакетное обновление меняет только присланные '
+            'поля и не затирает параллельные правки.'
+        )
+        assert (second.name, second.year) == ('Новое имя', 1980)
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "reviews_title"')
+                   and '"description"' in query['sql']]
+        assert not updates
+
+    def test_08_duplicated_genre(self, admin_client):
+        items = self.make_items(2)
+        items[0]['genre'] = ['drama', 'drama']
+        response = self.post(admin_client, items)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что повторённый в произведении жанр не приводит '
+            'к ошибке сервера.'
+        )
+        title = Title.objects.get(name='Произведение 0')
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+        assert Title.objects.count() == 2
@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from reviews.cache import category_id_cache, genre_id_cache
+from reviews.models import (
+    CATEGORIES,
+    Category,
+    CollectionVersion,
+    Genre,
+    Title,
+)
+from reviews.utils import bump_collection_versions
+from tests.utils import create_catalogue, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SlugCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture
+    def titles(self):
+        categories, genres = create_catalogue()
+        return [
+            create_title('Терминатор', 1984, categories['films'],
+                         [genres['drama']]),
+            create_title('Мастер и Маргарита', 1967, categories['books'],
+                         [genres['drama'], genres['comedy']]),
+        ]
+
+    def get_ids(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_filters_use_integer_keys(self, client, titles):
+        self.get_ids(client, {'category': 'books', 'genre': 'drama'})
+        with CaptureQueriesContext(connection) as context:
+            ids = self.get_ids(client, {'category': 'books',
+                                        'genre': 'drama'})
+        assert ids == [titles[1].id]
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert '"slug" =' not in sql and '"slug" IN' not in sql, (
+            'Проверьте, что фильтры `category` и `genre` превращают слаги в '
+            'id без обращения к таблицам категорий и жанров.'
+        )
+        assert self.get_ids(client, {'genre': 'horror'}) == []
+
+    def test_02_writes_invalidate_cache(self, client, admin_client, titles):
+        assert self.get_ids(client, {'genre': 'comedy'}) == [titles[1].id]
+        response = admin_client.post(self.GENRES_URL,
+                                     data={'name': 'Ужасы', 'slug': 'horror'})
+        assert response.status_code == HTTPStatus.CREATED
+        titles[0].genre.add(Genre.objects.get(slug='horror'))
+        assert self.get_ids(client, {'genre': 'horror'}) == [titles[0].id]
+
+        response = admin_client.delete(f'{self.GENRES_URL}comedy/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        Genre.objects.create(name='Комедия', slug='comedy')
+        assert self.get_ids(client, {'genre': 'comedy'}) == [], (
+            'Проверьте, что удаление жанра сбрасывает кэш слагов.'
+        )
+
+    def test_03_version_check_between_processes(self, client, titles,
+                                                 settings):
+        settings.SLUG_CACHE_TIMEOUT = 0
+        assert category_id_cache.get('films') == titles[0].category_id
+        Category.objects.filter(slug='films').update(slug='movies')
+        bump_collection_versions(CATEGORIES)
+        category_id_cache.ids = {'films': titles[0].category_id}
+        assert category_id_cache.get('movies') == titles[0].category_id, (
+            'Проверьте, что кэш слагов перечитывается после изменения '
+            'версии коллекции.'
+        )
+        assert category_id_cache.get('films') is None
+
+    def test_04_title_create_uses_cache(self, admin_client, titles):
+        genre_id_cache.get('drama')
+        category_id_cache.get('films')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': 'Чужой', 'year': 1979, 'category': 'films',
+                'genre': ['drama', 'comedy'],
+            }, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['category']['slug'] == 'films'
+        assert len(response.json()['genre']) == 2
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert '"slug" IN' not in sql and '"slug" =' not in sql
+
+    def test_05_unknown_slugs_keep_map(self, titles):
+        category_id_cache.get('films')
+        with CaptureQueriesContext(connection) as context:
+            assert category_id_cache.resolve(['films', 'music']) == {
+                'films': titles[0].category_id}
+        sql = [query['sql'] for query in context.captured_queries]
+        assert len(sql) == 1 and '"slug" IN' in sql[0], (
+            'Проверьте, что неизвестные слаги проверяются одним запросом '
+            'без перечитывания всех категорий.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert category_id_cache.get('music') is None
+        sql = [query['sql'] for query in context.captured_queries]
+        assert len(sql) == 1 and '"slug"' not in sql[0], (
+            'Проверьте, что промахи кэша слагов запоминаются до смены '
+            'версии коллекции.'
+        )
+        # Категорию создаёт другой процесс: локальный кэш не сброшен.
+        Category.objects.bulk_create([Category(name='Музыка', slug='music')])
+        CollectionVersion.objects.filter(name=CATEGORIES).update(
+            version=F('version') + 1)
+        assert category_id_cache.get('music') is not None, (
+            'Проверьте, что запомненный промах перепроверяется после смены '
+            'версии коллекции в другом процессе.'
+        )
+
+    def test_06_write_with_slug_deleted_elsewhere(self, admin_client,
+                                                  titles):
+        stale_categories = dict(category_id_cache.get_ids())
+        stale_genres = dict(genre_id_cache.get_ids())
+        Category.objects.filter(slug='books').delete()
+        Genre.objects.filter(slug='comedy').delete()
+        # Удаление в другом процессе: локальные карты не сброшены.
+        category_id_cache.ids = stale_categories
+        genre_id_cache.ids = stale_genres
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой', 'year': 1979, 'category': 'books',
+            'genre': ['drama'],
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запись со слагом, удалённым в другом процессе, '
+            'возвращает ошибку валидации, а не ошибку сервера.'
+        )
+        assert 'category' in response.json()
+        genre_id_cache.ids = stale_genres
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0].id}/',
+            data={'genre': ['comedy']}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
+        assert not Title.objects.filter(name='Чужой').exists()
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_catalogue, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TitleMultiFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        categories, genres = create_catalogue(
+            categories=('films', 'books', 'music'),
+            genres=('drama', 'comedy', 'horror'))
+        drama = genres['drama']
+        return [
+            create_title('Терминатор', 1984, categories['films'], [drama]),
+            create_title('Мастер и Маргарита', 1967, categories['books'],
+                         [drama, genres['comedy']]),
+            create_title('Оно', 1986, categories['books'],
+                         [drama, genres['horror']]),
+        ]
+
+    def get_ids(self, client, params, status=HTTPStatus.OK):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == status
+        if status != HTTPStatus.OK:
+            return None
+        data = response.json()
+        ids = [title['id'] for title in data['results']]
+        assert data['count'] == len(ids)
+        return sorted(ids)
+
+    def test_01_genre_any(self, client, titles):
+        ids = self.get_ids(client, {'genre': 'comedy,horror,drama'})
+        assert ids == [title.id for title in titles], (
+            'Проверьте, что фильтр `genre` со списком жанров возвращает '
+            'каждое произведение один раз.'
+        )
+        assert self.get_ids(client, {'genre': 'comedy,western'}) == [
+            titles[1].id]
+        assert self.get_ids(client, {'genre': 'western'}) == []
+
+    def test_02_genre_all(self, client, titles):
+        params = {'genre': 'drama,horror', 'genre_match': 'all'}
+        assert self.get_ids(client, params) == [titles[2].id], (
+            'Проверьте, что `genre_match=all` оставляет только произведения '
+            'со всеми перечисленными жанрами.'
+        )
+        params['genre'] = 'drama,western'
+        assert self.get_ids(client, params) == []
+        self.get_ids(client, {'genre': 'drama', 'genre_match': 'some'},
+                     status=HTTPStatus.BAD_REQUEST)
+
+    def test_03_category_list_and_years(self, client, titles):
+        assert self.get_ids(client, {'category': 'films,books'}) == [
+            title.id for title in titles]
+        assert self.get_ids(client, {'category': 'music,books',
+                                     'year_min': 1980}) == [titles[2].id]
+        assert self.get_ids(client, {'year_min': 1970,
+                                     'year_max': 1985}) == [titles[0].id], (
+            'Проверьте, что параметры `year_min` и `year_max` ограничивают '
+            'год выпуска включительно.'
+        )
+
+    def test_04_no_join_on_genre_links(self, client, titles):
+        params = {'genre': 'drama,comedy', 'category': 'books'}
+        self.get_ids(client, params)
+        with CaptureQueriesContext(connection) as context:
+            self.get_ids(client, params)
+        sql = ' '.join(query['sql'] for query in context.captured_queries
+                       if 'FROM "reviews_title" ' in query['sql'])
+        assert 'JOIN "reviews_title_genre"' not in sql
+        assert 'EXISTS' in sql, (
+            'Проверьте, что фильтр по жанрам использует подзапрос `EXISTS`.'
+        )
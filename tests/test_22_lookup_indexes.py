@@ -0,0 +1,57 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.benchmarks import LOOKUP_INDEXES
+from reviews.models import Review, Title
+from tests.utils import create_catalogue, create_title
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LookupIndexes:
+
+    def get_index_names(self):
+        with connection.cursor() as cursor:
+            return {
+                name
+                for table in ('reviews_review', 'reviews_comment',
+                              'users_user')
+                for name in connection.introspection.get_constraints(
+                    cursor, table)
+            }
+
+    def test_01_explain_lookups(self):
+        out = StringIO()
+        call_command('explain_lookups', seed=50, repeat=1, stdout=out)
+        output = out.getvalue()
+        for name in LOOKUP_INDEXES:
+            assert f'INDEX {name}' in output, (
+                f'Проверьте, что горячие запросы используют индекс `{name}`.'
+            )
+        assert 'SCAN users_user' in output
+        assert 'USE TEMP B-TREE FOR ORDER BY' in output
+        assert not Title.objects.exists(), (
+            'Проверьте, что `explain_lookups` откатывает тестовые данные.'
+        )
+        assert not User.objects.exists()
+        assert set(LOOKUP_INDEXES) <= self.get_index_names()
+
+    def test_02_reviews_ordered_by_date(self, client, user, moderator):
+        categories, _ = create_catalogue(categories=('films', ), genres=())
+        title = create_title('Терминатор', 1984, categories['films'])
+        old = Review.objects.create(title=title, author=user, score=5,
+                                    text='Старый',
+                                    pub_date='2025-01-01T00:00Z')
+        new = Review.objects.create(title=title, author=moderator, score=7,
+                                    text='Новый',
+                                    pub_date='2025-02-01T00:00Z')
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        assert [review['id'] for review in response.json()['results']] == [
+            new.id, old.id], (
+            'Проверьте, что отзывы выводятся от новых к старым.'
+        )
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+
+PARALLEL_REQUESTS = 8
+MAX_ATTEMPTS = 50
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ReviewUnique:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture
+    def title(self):
+        return Title.objects.create(name='Терминатор', year=1984)
+
+    def post_review(self, client, title_id, score=7):
+        return client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            data={'text': 'Отзыв', 'score': score})
+
+    def test_01_parallel_reviews(self, user, title):
+        barrier = threading.Barrier(PARALLEL_REQUESTS)
+
+        def post(score):
+            # Клиент не пробрасывает исключения: он ловит их глобальным
+            # сигналом и в потоках путает запросы. Тестовая БД в памяти не
+            # ждёт блокировку, а сразу отвечает «table is locked» (500) —
+            # такой запрос повторяется.
+            client = APIClient(raise_request_exception=False)
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                for _ in range(MAX_ATTEMPTS):
+                    status = self.post_review(client, title.id,
+                                              score).status_code
+                    if status != HTTPStatus.INTERNAL_SERVER_ERROR:
+                        return status
+                    time.sleep(0.01)
+                pytest.fail(
+                    f'Запрос на создание отзыва {MAX_ATTEMPTS} раз подряд '
+                    'завершился ошибкой 500.')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(PARALLEL_REQUESTS) as executor:
+            statuses = list(executor.map(
+                post, range(1, PARALLEL_REQUESTS + 1)))
+        assert statuses.count(HTTPStatus.CREATED) == 1, (
+            'Проверьте, что из параллельных запросов одного автора '
+            'создаётся ровно один отзыв.'
+        )
+        assert statuses.count(HTTPStatus.BAD_REQUEST) == (
+            PARALLEL_REQUESTS - 1)
+        review = Review.objects.get()
+        title.refresh_from_db()
+        assert title.review_count == 1
+        assert title.rating == review.score
+
+    def test_02_second_review_and_missing_title(self, user_client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_review(user_client, title.id)
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any('FROM "reviews_review"' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что создание отзыва не проверяет дубликат '
+            'отдельным запросом.'
+        )
+        response = self.post_review(user_client, title.id)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['text'] == 'Нельзя создать второй отзыв'
+        response = self.post_review(user_client, title.id + 1)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert Review.objects.count() == 1
+
+    def test_03_constraint(self, user, title):
+        Review.objects.create(title=title, author=user, score=5, text='Раз',
+                              pub_date='2025-01-01T00:00Z')
+        with pytest.raises(IntegrityError):
+            Review.objects.create(title=title, author=user, score=6,
+                                  text='Два', pub_date='2025-01-02T00:00Z')
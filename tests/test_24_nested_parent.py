@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24NestedParent:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/')
+
+    @pytest.fixture
+    def review(self, user, moderator):
+        review = Review.objects.create(
+            title=Title.objects.create(name='Терминатор', year=1984),
+            author=moderator, score=8, text='Отзыв',
+            pub_date='2025-01-01T00:00Z')
+        for number in range(3):
+            Comment.objects.create(review=review, author=user,
+                                   text=f'Комментарий {number}',
+                                   pub_date='2025-01-02T00:00Z')
+        return review
+
+    def get_url(self, review, comment=None, title_id=None):
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id or review.title_id, review_id=review.id)
+        return url if comment is None else f'{url}{comment.id}/'
+
+    def count_queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = method(url, **kwargs)
+        return response, len(context.captured_queries)
+
+    def test_01_query_budget(self, client, user_client, review):
+        comment = review.comemnts.first()
+        # Пользователь по JWT-токену: один запрос на каждый запрос к API.
+        cases = (
+            (client.get, self.get_url(review), {}, HTTPStatus.OK, 3),
+            (user_client.post, self.get_url(review),
+             {'data': {'text': 'Новый'}}, HTTPStatus.CREATED, 3),
+            (user_client.patch, self.get_url(review, comment),
+             {'data': {'text': 'Исправлен'}}, HTTPStatus.OK, 4),
+            # Удаление пишет запись для выгрузки удалений, поэтому Django
+            # выполняет его в транзакции.
+            (user_client.delete, self.get_url(review, comment), {},
+             HTTPStatus.NO_CONTENT, 7),
+        )
+        for method, url, kwargs, status, budget in cases:
+            response, queries = self.count_queries(method, url, **kwargs)
+            assert response.status_code == status
+            assert queries <= budget, (
+                f'Проверьте, что {method.__name__.upper()}-запрос к `{url}` '
+                f'выполняет не больше {budget} запросов к БД, а не '
+                f'{queries}.'
+            )
+
+    def test_02_wrong_parent(self, client, user_client, review):
+        other = Title.objects.create(name='Чужой', year=1979)
+        comment = review.comemnts.first()
+        for url in (self.get_url(review, title_id=other.id),
+                    self.get_url(review, comment, title_id=other.id)):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что отзыв другого произведения в URL '
+                'приводит к ответу 404.'
+            )
+            assert response.json()['detail'] == 'Неверно указанный отзыв'
+        response = user_client.post(self.get_url(review, title_id=other.id),
+                                    data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert Comment.objects.count() == 3
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.cache import title_cards
+from reviews.models import Comment, Review
+from tests.utils import create_catalogue, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def title(self, user):
+        categories, genres = create_catalogue(categories=('films', ),
+                                              genres=('drama', ))
+        title = create_title('Терминатор', 1984, categories['films'],
+                             [genres['drama']], description='Фантастика')
+        review = Review.objects.create(title=title, author=user, score=8,
+                                       text='Отзыв',
+                                       pub_date='2025-01-01T00:00Z')
+        Comment.objects.create(review=review, author=user, text='Да',
+                               pub_date='2025-01-02T00:00Z')
+        return title
+
+    def get(self, client, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        return response.json(), sql
+
+    def test_01_title_fields(self, client, title):
+        title_cards.reset_stats()
+        data, sql = self.get(client, self.TITLES_URL,
+                             {'fields': 'id,name,rating'})
+        assert data['results'] == [{'id': title.id, 'name': 'Терминатор',
+                                    'rating': 8.0}], (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля произведения.'
+        )
+        assert '"description"' not in sql and 'reviews_category' not in sql
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что без поля `genre` жанры не загружаются из БД.'
+        )
+        assert title_cards.get_stats()['misses'] == 0
+
+    def test_02_title_omit_and_detail(self, client, title):
+        data, sql = self.get(client, self.TITLES_URL,
+                             {'omit': 'description,category'})
+        assert set(data['results'][0]) == {'id', 'name', 'year', 'genre',
+                                           'rating'}
+        assert data['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}]
+        assert 'reviews_category' not in sql
+
+        url = f'{self.TITLES_URL}{title.id}/'
+        data, _ = self.get(client, url, {'fields': 'name,category'})
+        assert data == {'name': 'Терминатор',
+                        'category': {'name': 'Фильм', 'slug': 'films'}}
+        assert (client.get(url)['ETag']
+                != client.get(url, {'fields': 'name'})['ETag']), (
+            'Проверьте, что ETag зависит от набора полей.'
+        )
+
+        data, _ = self.get(client, self.TITLES_URL,
+                           {'search': 'терминатор', 'fields': 'id'})
+        assert data['results'] == [{'id': title.id}]
+
+    def test_03_reviews_comments_users(self, client, admin_client, title):
+        url = f'{self.TITLES_URL}{title.id}/reviews/'
+        data, sql = self.get(client, url, {'fields': 'id,score'})
+        assert data['results'] == [{'id': title.reviews.get().id,
+                                    'score': 8}]
+        assert '"text"' not in sql and 'users_user' not in sql
+
+        url = f'{url}{title.reviews.get().id}/comments/'
+        data, sql = self.get(client, url, {'omit': 'author,pub_date'})
+        assert set(data['results'][0]) == {'id', 'text'}
+        assert 'users_user' not in sql
+
+        data, sql = self.get(admin_client, '/api/v1/users/',
+                             {'fields': 'username'})
+        assert {'username': 'TestUser'} in data['results']
+        assert ('SELECT "users_user"."id", "users_user"."username" FROM'
+                in sql)
+
+    def test_04_errors_and_writes(self, client, admin_client, title):
+        response = client.get(self.TITLES_URL, {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` приводит к ответу 400.'
+        )
+        assert 'secret' in response.json()['fields']
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title.id}/?fields=id',
+            data={'name': 'Терминатор 2'}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Терминатор 2'
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_authors, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ExpandReviews:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        authors = create_authors(5)
+        titles = [create_title(f'Фильм {number}') for number in range(4)]
+        for title in titles:
+            for number, author in enumerate(authors):
+                Review.objects.create(
+                    title=title, author=author, score=number + 1,
+                    text=f'Отзыв {number}',
+                    pub_date=f'2025-01-0{number + 1}T00:00Z')
+        return titles
+
+    def get(self, client, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        return response, context.captured_queries
+
+    def test_01_list_in_one_query(self, client, titles):
+        response, queries = self.get(
+            client, self.TITLES_URL,
+            {'expand': 'reviews(limit=2,order=-score)'})
+        review_queries = [query['sql'] for query in queries
+                          if '"reviews_review"' in query['sql']]
+        assert len(review_queries) == 1, (
+            'Проверьте, что `expand=reviews` загружает отзывы всех '
+            'произведений страницы одним запросом.'
+        )
+        assert 'ROW_NUMBER()' in review_queries[0]
+        assert '"users_user"' in review_queries[0]
+        for title in response.json()['results']:
+            assert [review['score'] for review in title['reviews']] == [
+                5, 4], (
+                'Проверьте, что `limit` и `order` задают число и порядок '
+                'вложенных отзывов.'
+            )
+            assert title['reviews'][0]['text'] == 'Отзыв 4'
+            assert 'author4' in title['reviews'][0]['author']
+        assert 'ETag' not in response, (
+            'Проверьте, что ответ с вложенными отзывами не кэшируется по '
+            'ETag: отзывы меняются без смены версии произведения.'
+        )
+
+    def test_02_detail_and_defaults(self, client, titles):
+        response, _ = self.get(
+            client, f'{self.TITLES_URL}{titles[0].id}/',
+            {'expand': 'reviews', 'fields': 'id'})
+        data = response.json()
+        assert set(data) == {'id', 'reviews'}
+        assert [review['text'] for review in data['reviews']] == [
+            'Отзыв 4', 'Отзыв 3', 'Отзыв 2'], (
+            'Проверьте, что по умолчанию вкладываются три новых отзыва.'
+        )
+        response, _ = self.get(client, f'{self.TITLES_URL}{titles[0].id}/',
+                               {})
+        assert 'reviews' not in response.json()
+
+    @pytest.mark.parametrize('expand', [
+        'comments', 'reviews(limit=0)', 'reviews(limit=100)',
+        'reviews(order=text)', 'reviews(size=2)', 'reviews(limit',
+    ])
+    def test_03_invalid(self, client, titles, expand):
+        response = client.get(self.TITLES_URL, {'expand': expand})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `expand={expand}` приводит к ответу 400.'
+        )
+        assert 'expand' in response.json()
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, TitleStats
+from tests.utils import create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleStats:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def title(self):
+        return create_title('Терминатор', 1984)
+
+    def get_stats(self, client, title_id):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.TITLES_URL}{title_id}/stats/')
+        assert not any('"reviews_review"' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что статистика произведения не перебирает отзывы.'
+        )
+        return response
+
+    def test_01_stats_follow_reviews(self, client, user_client,
+                                     moderator_client, admin_client, title):
+        url = f'{self.TITLES_URL}{title.id}/reviews/'
+        for api_client, score in ((user_client, 3), (moderator_client, 8),
+                                  (admin_client, 8)):
+            response = api_client.post(url, data={'text': 'Отзыв',
+                                                  'score': score})
+            assert response.status_code == HTTPStatus.CREATED
+        response = self.get_stats(client, title.id)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 3 and data['median'] == 8
+        assert data['mean'] == pytest.approx(19 / 3)
+        assert data['histogram'] == {
+            str(score): {3: 1, 8: 2}.get(score, 0) for score in range(1, 11)
+        }, 'Проверьте, что гистограмма считает отзывы по каждой оценке.'
+
+        review = Review.objects.get(score=3)
+        response = user_client.patch(f'{url}{review.id}/',
+                                     data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        response = moderator_client.delete(
+            f'{url}{Review.objects.filter(score=8).first().id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = self.get_stats(client, title.id).json()
+        assert data['count'] == 2 and data['median'] == 9
+        assert data['histogram']['3'] == 0 and data['histogram']['10'] == 1, (
+            'Проверьте, что изменение и удаление отзыва обновляют '
+            'статистику.'
+        )
+
+        admin_client.delete(f'{self.TITLES_URL}{title.id}/')
+        assert not TitleStats.objects.exists()
+
+    def test_02_empty_and_missing(self, client, title):
+        data = self.get_stats(client, title.id).json()
+        assert data['count'] == 0 and data['mean'] is None
+        assert self.get_stats(client, title.id + 1).status_code == (
+            HTTPStatus.NOT_FOUND)
+
+    def test_03_rebuild_command(self, client, user, moderator, title):
+        Review.objects.bulk_create([
+            Review(title=title, author=author, score=score, text='Отзыв',
+                   pub_date='2025-01-01T00:00Z')
+            for author, score in ((user, 2), (moderator, 6))
+        ])
+        TitleStats.objects.update_or_create(title=title,
+                                            defaults={'score_9': 5})
+        out = StringIO()
+        call_command('rebuild_title_stats', stdout=out)
+        assert 'Пересчитано: 1' in out.getvalue()
+        data = self.get_stats(client, title.id).json()
+        assert data['count'] == 2 and data['median'] == 4, (
+            'Проверьте, что `rebuild_title_stats` пересчитывает сводку '
+            'по отзывам.'
+        )
+        assert data['histogram']['9'] == 0
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import RankingPrior, Review, TitleRank
+from tests.utils import create_authors, create_catalogue, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    @pytest.fixture
+    def titles(self, settings):
+        settings.TITLE_RANK_MIN_REVIEWS = 5
+        categories, genres = create_catalogue(genres=('drama', ))
+        authors = create_authors(9)
+        titles = {
+            'single': create_title('Один отзыв',
+                                   category=categories['films']),
+            'popular': create_title('Популярный',
+                                    category=categories['books'],
+                                    genres=[genres['drama']]),
+            'bad': create_title('Плохой', category=categories['films']),
+        }
+        for name, scores in (('single', [10]), ('popular', [9] * 6),
+                             ('bad', [2] * 3)):
+            for author, score in zip(authors, scores):
+                Review.objects.create(title=titles[name], author=author,
+                                      score=score, text='Отзыв',
+                                      pub_date='2025-01-01T00:00Z')
+        out = StringIO()
+        call_command('rebuild_title_ranks', stdout=out)
+        assert 'Пересчитано: 3, C = 7.000' in out.getvalue()
+        titles['authors'] = authors
+        return titles
+
+    def get_names(self, client, params=None):
+        response = client.get(self.TOP_URL, params or {})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()]
+
+    def test_01_bayesian_order(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Популярный', 'Один отзыв', 'Плохой'], (
+            'Проверьте, что произведение с одной оценкой 10 не обгоняет '
+            'произведение с большим числом высоких оценок.'
+        )
+        assert [title['rank'] for title in data] == [1, 2, 3]
+        assert data[0]['weighted_rating'] == pytest.approx(89 / 11)
+        assert data[0]['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert not any('"reviews_review"' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что рейтинг читается из готовой таблицы мест.'
+        )
+        assert self.get_names(client, {'limit': 1}) == ['Популярный']
+
+        for author in titles['authors'][1:3]:
+            Review.objects.create(title=titles['single'], author=author,
+                                  score=10, text='Отзыв',
+                                  pub_date='2025-01-02T00:00Z')
+        assert self.get_names(client)[0] == 'Один отзыв', (
+            'Проверьте, что место произведения обновляется при '
+            'добавлении отзыва.'
+        )
+
+    def test_02_filters(self, client, admin_client, titles):
+        assert self.get_names(client, {'category': 'films'}) == [
+            'Один отзыв', 'Плохой']
+        assert self.get_names(client, {'genre': 'drama'}) == ['Популярный']
+        assert self.get_names(client, {'category': 'films',
+                                       'genre': 'drama'}) == []
+        assert self.get_names(client, {'category': 'unknown'}) == []
+        for limit in ('0', '101', 'abc'):
+            response = client.get(self.TOP_URL, {'limit': limit})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles["popular"].id}/',
+            data={'category': 'films'}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_names(client, {'category': 'films'})[0] == (
+            'Популярный'), (
+            'Проверьте, что смена категории переносит произведение '
+            'в рейтинг новой категории.'
+        )
+
+    def test_03_removed_titles(self, client, admin_client, titles):
+        for review in titles['bad'].reviews.all():
+            review.delete()
+        assert 'Плохой' not in self.get_names(client), (
+            'Проверьте, что произведение без отзывов не попадает '
+            'в рейтинг.'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles["single"].id}/')
+        assert self.get_names(client) == ['Популярный']
+        assert TitleRank.objects.count() == 1
+
+    @pytest.mark.parametrize('stored_prior', [None, 0])
+    def test_04_prior_after_empty_database(self, client, settings,
+                                           stored_prior):
+        settings.TITLE_RANK_MIN_REVIEWS = 5
+        RankingPrior.objects.all().delete()
+        if stored_prior is not None:
+            # Так миграция сохраняла C для базы без отзывов.
+            RankingPrior.objects.create(mean=stored_prior, min_reviews=5)
+        title = create_title('Средний')
+        for author in create_authors(3):
+            Review.objects.create(title=title, author=author, score=3,
+                                  text='Отзыв', pub_date='2025-01-01T00:00Z')
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()[0]['weighted_rating'] == pytest.approx(3), (
+            'Проверьте, что среднее C пересчитывается, когда в пустой базе '
+            'появляются отзывы, а не остаётся равным 0.'
+        )
+        assert RankingPrior.objects.get().mean == pytest.approx(3)
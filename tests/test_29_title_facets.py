@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review
+from tests.utils import create_catalogue, create_title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleFacets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        categories, genres = create_catalogue()
+        films, drama = categories['films'], genres['drama']
+        return [
+            create_title('Терминатор', 1984, films,
+                         [drama, genres['comedy']]),
+            create_title('Чужой', 1979, films, [drama]),
+            create_title('Мастер и Маргарита', 1967, categories['books'],
+                         [drama]),
+        ]
+
+    def get_facets(self, client, params):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['facets'], [
+            query['sql'] for query in context.captured_queries]
+
+    def test_01_unfiltered_counters(self, client, titles):
+        facets, queries = self.get_facets(
+            client, {'facets': 'genre,category,year'})
+        assert facets['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 3},
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+        ]
+        assert facets['category'] == [
+            {'slug': 'films', 'name': 'Фильм', 'count': 2},
+            {'slug': 'books', 'name': 'Книга', 'count': 1},
+        ]
+        assert facets['year'] == [{'year': 1984, 'count': 1},
+                                  {'year': 1979, 'count': 1},
+                                  {'year': 1967, 'count': 1}]
+        assert not any('GROUP BY' in sql for sql in queries if
+                       '"reviews_title_genre"' in sql), (
+            'Проверьте, что без фильтров фасеты жанров берутся из '
+            'счётчиков жанров.'
+        )
+
+    def test_02_filtered_and_cached(self, client, titles):
+        params = {'category': 'films,books', 'year_min': 1970,
+                  'facets': 'genre,category'}
+        facets, queries = self.get_facets(client, params)
+        assert facets['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 2},
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+        ], 'Проверьте, что фасеты считаются с учётом текущих фильтров.'
+        assert facets['category'] == [
+            {'slug': 'films', 'name': 'Фильм', 'count': 2}]
+        assert any('GROUP BY' in sql for sql in queries)
+
+        params['category'] = 'books,films'
+        cached, queries = self.get_facets(client, params)
+        assert cached == facets
+        assert not any('GROUP BY' in sql for sql in queries), (
+            'Проверьте, что фасеты кэшируются по нормализованному набору '
+            'фильтров.'
+        )
+
+        titles[1].genre.clear()
+        facets, _ = self.get_facets(client, params)
+        assert facets['genre'][0]['count'] == 1
+
+        facets, _ = self.get_facets(client, {'search': 'терминатор',
+                                             'facets': 'year'})
+        assert facets['year'] == [{'year': 1984, 'count': 1}]
+
+    def test_03_counters_follow_changes(self, client, admin_client, titles):
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0].id}/',
+            data={'category': 'books', 'genre': ['comedy']}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        admin_client.delete(f'{self.TITLES_URL}{titles[2].id}/')
+        Genre.objects.get(slug='comedy').titles.add(titles[1])
+        assert dict(Category.objects.values_list('slug', 'title_count')) == {
+            'films': 1, 'books': 1}, (
+            'Проверьте, что счётчики произведений категорий обновляются.'
+        )
+        assert dict(Genre.objects.values_list('slug', 'title_count')) == {
+            'drama': 1, 'comedy': 2}
+        response = client.get(self.TITLES_URL, {'facets': 'rating'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'facets' in response.json()
+
+    def test_04_cache_survives_rating_updates(self, client, user, titles):
+        params = {'category': 'films', 'facets': 'genre'}
+        facets, _ = self.get_facets(client, params)
+        Review.objects.create(title=titles[0], author=user, text='Отлично',
+                              score=10, pub_date='2025-01-01T00:00Z')
+        cached, queries = self.get_facets(client, params)
+        assert cached == facets
+        assert not any('GROUP BY' in sql for sql in queries), (
+            'Проверьте, что новый отзыв и пересчёт рейтинга не сбрасывают '
+            'кэш фасетов.'
+        )
+        titles[0].genre.remove(Genre.objects.get(slug='comedy'))
+        facets, _ = self.get_facets(client, params)
+        assert facets['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 2}]
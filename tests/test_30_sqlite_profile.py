@@ -0,0 +1,119 @@
+import importlib
+import re
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+
+from reviews import serializers
+from reviews.benchmarks import get_profile_settings
+from reviews.models import Title
+from reviews.utils import retry_on_locked
+from tests.utils import create_catalogue
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30SqliteProfile:
+
+    def test_01_production_profile(self, monkeypatch, tmp_path):
+        module = importlib.import_module('api_yamdb.settings')
+        monkeypatch.setenv('YAMDB_SQLITE_PROFILE', 'production')
+        try:
+            database = importlib.reload(module).DATABASES['default']
+        finally:
+            monkeypatch.delenv('YAMDB_SQLITE_PROFILE')
+            importlib.reload(module)
+        assert database['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что профиль production переиспользует соединения.'
+        )
+        assert database['OPTIONS']['transaction_mode'] == 'IMMEDIATE'
+        conn = sqlite3.connect(tmp_path / 'db.sqlite3')
+        for command in database['OPTIONS']['init_command'].split(';'):
+            conn.execute(command)
+        pragmas = {name: conn.execute(f'PRAGMA {name}').fetchone()[0]
+                   for name in ('journal_mode', 'synchronous',
+                                'busy_timeout')}
+        conn.close()
+        assert pragmas == {'journal_mode': 'wal', 'synchronous': 1,
+                           'busy_timeout': 5000}
+
+    def test_02_retry_on_locked(self, settings):
+        settings.SQLITE_LOCK_RETRY_DELAY = 0
+        calls = []
+
+        def write(error=None, failures=1):
+            calls.append(error)
+            if len(calls) <= failures:
+                raise OperationalError(error)
+            return 'ok'
+
+        assert retry_on_locked(write, 'database is locked') == 'ok'
+        assert len(calls) == 2, (
+            'Проверьте, что запись повторяется при «database is locked».'
+        )
+        calls.clear()
+        assert retry_on_locked(write, 'database is locked',
+                               atomic=False) == 'ok'
+        assert len(calls) == 2
+        calls.clear()
+        with pytest.raises(OperationalError):
+            retry_on_locked(write, 'no such table')
+        assert len(calls) == 1
+        calls.clear()
+        with pytest.raises(OperationalError):
+            retry_on_locked(write, 'database is locked', failures=10)
+        assert len(calls) == settings.SQLITE_LOCK_RETRIES + 1
+
+    def test_03_load_test(self, settings):
+        out = StringIO()
+        call_command('sqlite_load_test', seconds=0.3, stdout=out)
+        results = {
+            profile: (float(reads), float(writes), int(locked))
+            for profile, reads, writes, locked in re.findall(
+                r'(\w+): чтений (\d+)/с, записей (\d+)/с, блокировок (\d+)',
+                out.getvalue())
+        }
+        assert set(results) == {'default', 'production'}
+        assert re.search(r'production/default: чтений x[\d.]+',
+                         out.getvalue()), (
+            'Проверьте, что команда выводит сравнение профилей.'
+        )
+        assert get_profile_settings('production', 'load.sqlite3')[
+            'OPTIONS'] == settings.SQLITE_PRODUCTION_PROFILE['OPTIONS'], (
+            'Проверьте, что нагрузочный тест открывает соединения Django '
+            'с настройками профиля production.'
+        )
+        assert get_profile_settings('default', 'load.sqlite3')[
+            'OPTIONS'] == {}
+        assert results['production'][2] == 0, (
+            'Проверьте, что в профиле production записи не падают '
+            'с «database is locked».'
+        )
+
+    def test_04_batch_retries_on_locked(self, admin_client, settings,
+                                        monkeypatch):
+        settings.SQLITE_LOCK_RETRY_DELAY = 0
+        create_catalogue(categories=('films', ), genres=('drama', ))
+        bump = serializers.bump_collection_versions
+        calls = []
+
+        def locked_once(*names):
+            calls.append(names)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return bump(*names)
+
+        monkeypatch.setattr(serializers, 'bump_collection_versions',
+                            locked_once)
+        response = admin_client.post('/api/v1/titles/batch/', data=[
+            {'name': f'Фильм {number}', 'year': 2000, 'category': 'films',
+             'genre': ['drama']} for number in range(3)
+        ], format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что пакетная запись произведений повторяется при '
+            '«database is locked».'
+        )
+        assert len(calls) == 2
+        assert Title.objects.count() == 3
@@ -0,0 +1,93 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from api.routing import (
+    STICKY_COOKIE,
+    PrimaryReplicaRouter,
+    replica_routing,
+)
+from reviews.models import Review, Title
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Вторая база SQLite в файле. Вызов sync() копирует в неё основную
+    базу, как это делала бы репликация."""
+    path = tmp_path / 'replica.sqlite3'
+    primary = connections['default']
+    connections[REPLICA] = primary.__class__(
+        {**primary.settings_dict, 'NAME': str(path)}, REPLICA)
+    settings.DATABASE_REPLICAS = [REPLICA]
+
+    def sync():
+        connections[REPLICA].close()
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        primary.connection.backup(target)
+        target.close()
+
+    sync()
+    yield sync
+    connections[REPLICA].close()
+    del connections[REPLICA]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31ReadReplica:
+
+    def test_01_reads_go_to_replica(self, client, replica):
+        Title.objects.create(name='Терминатор', year=1984)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0, (
+            'Проверьте, что GET-запросы читают данные с реплики.'
+        )
+        replica()
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+
+    def test_02_sticky_after_write(self, user_client, token_user, replica):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        replica()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 8})
+        assert response.status_code == HTTPStatus.CREATED
+        assert STICKY_COOKIE in response.cookies
+        assert user_client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи клиент читает с основной базы '
+            'и видит свой отзыв.'
+        )
+
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
+        assert other_client.get(url).json()['count'] == 0
+        user_client.cookies[STICKY_COOKIE] = '0'
+        assert user_client.get(url).json()['count'] == 0, (
+            'Проверьте, что по истечении окна клиент снова читает '
+            'с реплики.'
+        )
+        replica()
+        assert other_client.get(url).json()['count'] == 1
+        assert Review.objects.count() == 1
+
+    def test_03_router(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        router = PrimaryReplicaRouter()
+        assert router.db_for_read(Title) == 'default'
+        with replica_routing(use_replica=True):
+            assert router.db_for_read(Title) == REPLICA
+            assert router.db_for_write(Title) == 'default'
+            assert router.db_for_read(Title) == 'default', (
+                'Проверьте, что после записи чтения в том же запросе идут '
+                'на основную базу.'
+            )
+        with replica_routing(use_replica=False):
+            assert router.db_for_read(Title) == 'default'
+        assert not router.allow_migrate(REPLICA, 'reviews')
+        assert router.allow_migrate('default', 'reviews')
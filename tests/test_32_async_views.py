@@ -0,0 +1,156 @@
+import re
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.utils import timezone
+from rest_framework.throttling import AnonRateThrottle
+
+from api.routing import STICKY_COOKIE
+from reviews.async_views import AsyncReadView
+from reviews.models import Category, Comment, Review
+from tests.utils import create_catalogue, create_title
+
+
+@pytest.fixture
+def fallbacks(monkeypatch):
+    """Адреса запросов, которые асинхронные представления отдали DRF."""
+    calls = []
+    fallback = AsyncReadView.fallback
+
+    async def record(self, request):
+        calls.append(request.get_full_path())
+        return await fallback(self, request)
+
+    monkeypatch.setattr(AsyncReadView, 'fallback', record)
+    return calls
+
+
+@pytest.fixture
+def async_get():
+    client = AsyncClient()
+    return lambda url, **kwargs: async_to_sync(client.get)(url, **kwargs)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32AsyncViews:
+
+    @pytest.fixture
+    def review(self, admin):
+        categories, genres = create_catalogue(categories=('films', ),
+                                              genres=('drama', ))
+        titles = [create_title(f'Фильм {number}', category=categories['films'])
+                  for number in range(7)]
+        titles[0].genre.add(genres['drama'])
+        review = Review.objects.create(title=titles[0], author=admin,
+                                       text='Отзыв', score=8,
+                                       pub_date=timezone.now())
+        Comment.objects.create(review=review, author=admin,
+                               text='Комментарий', pub_date=timezone.now())
+        return review
+
+    def test_01_same_as_sync(self, client, async_get, fallbacks, review):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        comment = Comment.objects.get(review=review)
+        for url in ('/api/v1/categories/', '/api/v1/genres/',
+                    '/api/v1/titles/', '/api/v1/titles/?page=2&page_size=3',
+                    f'/api/v1/titles/{review.title_id}/', reviews_url,
+                    f'{reviews_url}{review.id}/', comments_url,
+                    f'{comments_url}{comment.id}/'):
+            response = async_get(url)
+            expected = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.content == expected.content, (
+                f'Проверьте, что асинхронный GET-запрос к `{url}` '
+                'возвращает тот же ответ, что и синхронный.'
+            )
+            assert response.get('ETag') == expected.get('ETag')
+        assert fallbacks == [], (
+            'Проверьте, что простые GET-запросы списков и объектов '
+            'обслуживаются асинхронными представлениями.'
+        )
+
+    def test_02_fallback_to_sync(self, client, async_get, fallbacks,
+                                 token_admin, review):
+        title_url = f'/api/v1/titles/{review.title_id}/'
+        for url in ('/api/v1/titles/?genre=drama', '/api/v1/titles/?page=9',
+                    '/api/v1/titles/999/',
+                    f'/api/v1/titles/{review.title_id + 1}/reviews/'
+                    f'{review.id}/comments/'):
+            response = async_get(url)
+            expected = client.get(url)
+            assert (response.status_code, response.content) == (
+                expected.status_code, expected.content), (
+                f'Проверьте, что запрос к `{url}` обслуживает синхронное '
+                'представление.'
+            )
+        assert len(fallbacks) == 4
+
+        etag = async_get(title_url)['ETag']
+        response = async_get(title_url, headers={'If-None-Match': etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = async_to_sync(AsyncClient().patch)(
+            title_url, data={'name': 'Новое название'},
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {token_admin["access"]}'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись по адресу асинхронного представления '
+            'выполняет синхронное представление DRF.'
+        )
+        assert STICKY_COOKIE in response.cookies
+        assert async_get(title_url).json()['name'] == 'Новое название'
+
+    def test_03_etag_read_before_rows(self, async_get, fallbacks, review,
+                                      monkeypatch):
+        url = '/api/v1/categories/'
+        etag = async_get(url)['ETag']
+        serialize = AsyncReadView.serialize
+
+        async def write_then_serialize(self, *args, **kwargs):
+            # Запись, зафиксированная после чтения строк.
+            await sync_to_async(Category.objects.create)(
+                name='Книга', slug='books')
+            return await serialize(self, *args, **kwargs)
+
+        monkeypatch.setattr(AsyncReadView, 'serialize', write_then_serialize)
+        response = async_get(url)
+        assert response.json()['count'] == 1
+        assert response['ETag'] == etag, (
+            'Проверьте, что асинхронное представление читает версию '
+            'коллекции до строк ответа.'
+        )
+
+    def test_04_throttle_counts_once(self, async_get, fallbacks, review):
+        throttle = AnonRateThrottle()
+        key = throttle.cache_format % {'scope': throttle.scope,
+                                       'ident': '127.0.0.1'}
+        throttle.cache.delete(key)
+        async_get('/api/v1/titles/')
+        async_get('/api/v1/titles/999/')
+        assert fallbacks == ['/api/v1/titles/999/']
+        assert len(throttle.cache.get(key, [])) == 2, (
+            'Проверьте, что ограничитель частоты учитывает запрос один раз, '
+            'в том числе когда его отдаёт синхронное представление.'
+        )
+
+    def test_05_load_test(self):
+        out = StringIO()
+        call_command('async_load_test', clients=4, requests=8, threads=2,
+                     client_delay=0, stdout=out)
+        results = {
+            mode: (float(requests), int(errors))
+            for mode, requests, errors in re.findall(
+                r'(\w+): запросов (\d+)/с, ошибок (\d+)', out.getvalue())
+        }
+        assert set(results) == {'sync', 'async'}
+        assert results['sync'][1] == results['async'][1] == 0, (
+            'Проверьте, что команда отдаёт запросы без ошибок в обоих '
+            'режимах.'
+        )
+        assert re.search(r'async/sync: запросов x[\d.]+', out.getvalue()), (
+            'Проверьте, что команда выводит сравнение режимов.'
+        )
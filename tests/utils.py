@@ -1,5 +1,10 @@
 from http import HTTPStatus
 
+from reviews.models import Category, Genre, Title
+from users.models import User
+
+CATEGORY_NAMES = {'films': 'Фильм', 'books': 'Книга', 'music': 'Музыка'}
+GENRE_NAMES = {'drama': 'Драма', 'comedy': 'Комедия', 'horror': 'Ужасы'}
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +310,29 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def create_catalogue(categories=('films', 'books'),
+                     genres=('drama', 'comedy')):
+    """Создаёт категории и жанры в БД без API. Возвращает словари
+    объектов по слагам."""
+    return (
+        {slug: Category.objects.create(name=CATEGORY_NAMES[slug], slug=slug)
+         for slug in categories},
+        {slug: Genre.objects.create(name=GENRE_NAMES[slug], slug=slug)
+         for slug in genres},
+    )
+
+
+def create_title(name, year=2000, category=None, genres=(), **fields):
+    title = Title.objects.create(name=name, year=year, category=category,
+                                 **fields)
+    if genres:
+        title.genre.add(*genres)
+    return title
+
+
+def create_authors(count):
+    return User.objects.bulk_create(
+        User(username=f'author{number}', email=f'author{number}@yamdb.fake')
+        for number in range(count))